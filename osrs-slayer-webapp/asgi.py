@@ -0,0 +1,282 @@
+import asyncio
+import io
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from app import app, db, sse_message, SSE_KEEPALIVE, SSE_POLL
+from simulation import get_process_pool
+
+# ASGI entry point serving the same API as app.py, e.g.
+#     uvicorn asgi:application
+# Flask views run on a bounded thread pool so SQLite never blocks the event
+# loop, and simulations go on to the process pool. Event streams are served
+# on the loop itself: an idle SSE client costs a coroutine, not a thread.
+
+DB_THREADS = int(os.environ.get('SLAYER_DB_THREADS', 16))
+MAX_PENDING_EVENTS = 256
+
+db_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix='slayer-db')
+db.use_process_pool(get_process_pool())
+
+EVENTS_PATH = re.compile(r'^/api(?:/accounts/([^/]+))?/events$')
+
+class StreamQueue:
+    # One SSE client's pending change sets, merged as Subscription.get does
+    def __init__(self):
+        self.queue = asyncio.Queue(MAX_PENDING_EVENTS)
+        self.overflowed = False
+
+    def put(self, changes):
+        try:
+            self.queue.put_nowait(changes)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self):
+        changes = set(await self.queue.get())
+        while not self.queue.empty():
+            changes.update(self.queue.get_nowait())
+        if self.overflowed:
+            self.overflowed = False
+            return {('full',)}
+        return changes
+
+class EventHub:
+    # The loop's single ChangeFeed subscriber. A commit costs one thread-safe
+    # wakeup whatever the number of clients, and the events for an account are
+    # rendered once per change set and shared by all of its streams.
+    def __init__(self, loop):
+        self.loop = loop
+        self.streams = set()
+        self.rendered = {}      # (account id, changes) -> future of the SSE text
+        self._poller = None
+        self._exit = ExitStack()
+        self._exit.enter_context(db.subscribe_changes(self))
+
+    def add(self, stream):
+        self.streams.add(stream)
+        if self._poller is None:
+            self._poller = self.loop.create_task(self._poll())
+
+    def discard(self, stream):
+        # The poller stops by itself once no stream is left
+        self.streams.discard(stream)
+
+    async def _poll(self):
+        # Commits from other pre-forked workers only reach this process
+        # through change_log, which has to be polled while anyone is waiting
+        try:
+            while self.streams:
+                try:
+                    await self.loop.run_in_executor(db_executor, db.replay_change_log)
+                except Exception:
+                    pass    # most likely the database is busy; next time
+                await asyncio.sleep(SSE_POLL)
+        finally:
+            self._poller = None
+
+    def put(self, changes):
+        # Called on the committing thread
+        try:
+            self.loop.call_soon_threadsafe(self._dispatch, changes)
+        except RuntimeError:
+            pass    # loop closed
+
+    def _dispatch(self, changes):
+        self.rendered.clear()
+        for stream in self.streams:
+            stream.put(changes)
+
+    def render(self, account_db, changes):
+        key = (account_db.account_id, frozenset(changes))
+        future = self.rendered.get(key)
+        if future is None:
+            future = self.rendered[key] = self.loop.run_in_executor(
+                db_executor, lambda: sse_message(account_db.change_events(changes)))
+        return future
+
+    def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+        self._exit.close()
+
+_hubs = {}
+
+def get_hub():
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = EventHub(loop)
+    return hub
+
+def build_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': 'HTTP/' + scope.get('http_version', '1.1'),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope['headers']:
+        name = name.decode('latin-1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            continue    # the body is already read, see above
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin-1')
+        environ[key] = environ[key] + ',' + value if key in environ else value
+    return environ
+
+async def read_body(receive):
+    # None if the client went away first
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return bytes(body)
+
+def call_flask(environ):
+    # Runs on db_executor. Buffered responses (they carry a Content-Length)
+    # are read in the same hop; streamed ones come back as an open iterator.
+    started = []
+    def start_response(status, headers, exc_info=None):
+        started[:] = [int(status.split(' ', 1)[0]), headers]
+    iterable = app(environ, start_response)
+    status, headers = started
+    if any(name.lower() == 'content-length' for name, _ in headers):
+        try:
+            return status, headers, [b''.join(iterable)], None
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+    return status, headers, [], iterable
+
+async def serve_flask(scope, receive, send):
+    body = await read_body(receive)
+    if body is not None:
+        await send_flask(send, asyncio.get_running_loop(), build_environ(scope, body))
+
+async def send_flask(send, loop, environ):
+    status, headers, chunks, iterator = await loop.run_in_executor(db_executor, call_flask, environ)
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]})
+    if iterator is None:
+        await send({'type': 'http.response.body', 'body': chunks[0]})
+        return
+
+    # Streamed (e.g. paged listings): one executor hop per chunk
+    done = object()
+    iterator_next = iter(iterator).__next__
+    def next_chunk():
+        try:
+            return iterator_next()
+        except StopIteration:
+            return done
+    try:
+        while True:
+            chunk = await loop.run_in_executor(db_executor, next_chunk)
+            if chunk is done:
+                break
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        if hasattr(iterator, 'close'):
+            await loop.run_in_executor(db_executor, iterator.close)
+
+async def serve_events(scope, receive, send, account):
+    # Same stream as app.stream_events, without holding a thread
+    body = await read_body(receive)
+    if body is None:
+        return
+    loop = asyncio.get_running_loop()
+    account_db = db
+    if account is not None:
+        account_id = await loop.run_in_executor(db_executor, db.get_account_id, account)
+        if account_id is None:
+            # Let the Flask view give its usual 404
+            await send_flask(send, loop, build_environ(scope, body))
+            return
+        account_db = db.account(account_id)
+
+    hub = get_hub()
+    stream = StreamQueue()
+    hub.add(stream)
+    disconnected = asyncio.ensure_future(receive())
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no')]})
+        await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+        while True:
+            changed = asyncio.ensure_future(stream.get())
+            await asyncio.wait({changed, disconnected}, timeout=SSE_KEEPALIVE,
+                               return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                changed.cancel()
+                return
+            if not changed.done():
+                changed.cancel()
+                message = ': keepalive\n\n'
+            else:
+                message = await hub.render(account_db, changed.result())
+            await send({'type': 'http.response.body', 'body': message.encode('utf-8'), 'more_body': True})
+    finally:
+        hub.discard(stream)
+        disconnected.cancel()
+
+async def lifespan(receive, send):
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Load the catalog before the first request needs it
+            await loop.run_in_executor(db_executor, db.get_catalog)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            hub = _hubs.pop(loop, None)
+            if hub is not None:
+                hub.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    match = EVENTS_PATH.match(scope['path'])
+    if match and scope['method'] == 'GET':
+        await serve_events(scope, receive, send, match.group(1))
+    else:
+        await serve_flask(scope, receive, send)
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit('Serving asgi:application needs an ASGI server, e.g. pip install uvicorn')
+    uvicorn.run(application, port=int(os.environ.get('PORT', 5000)))
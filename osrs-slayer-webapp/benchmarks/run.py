@@ -0,0 +1,424 @@
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from operator import itemgetter
+
+# Times every SlayerDatabase read and write method and every API route (through
+# the Flask test client) against a synthetic catalog, and compares them with a
+# stored baseline. Baselines are per machine: regenerate them on the machine
+# that runs the comparison. From the app directory:
+#     python -m benchmarks.run --scale large
+#     python -m benchmarks.run --scale large --update-baseline
+# Exits with status 1 when a case got slower than the baseline allows.
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from benchmarks.synthetic import SCALES, build_database
+from database import SlayerDatabase
+from player import PlayerProfile
+from simulation import simulation_available
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')    # not committed
+DEFAULT_TOLERANCE = 0.5     # a case this much slower than its baseline is a regression...
+MIN_DELTA_MS = 0.25         # ...if its median also grew by this much (commit and timer noise)
+RECHECKS = 2                # a case that looks slower is measured again this many times
+
+# Deliberately not timed
+SKIPPED_METHODS = {
+    'account': 'returns a handle, no work',
+    'close': 'tears the database down',
+    'count_queries': 'diagnostic context manager',
+    'enable_change_log': 'multi-process setup, see serve.py',
+    'prepare_fork': 'multi-process setup, see serve.py',
+    'replay_change_log': 'multi-process only, timed inside every read',
+    'enable_write_behind': 'mode switch',
+    'disable_write_behind': 'mode switch',
+    'flush_kills': 'only does work in write-behind mode',
+    'get_connection': 'plumbing',
+    'transaction': 'plumbing',
+    'subscribe_changes': 'plumbing for the event stream',
+    'use_process_pool': 'mode switch',
+    'record_seed': 'seed bookkeeping, timed through /api/init-common-tasks',
+}
+SKIPPED_ROUTES = {
+    'static': 'serves files',
+    'stream_events': 'never finishes; its per-change work is timed as change_events',
+}
+
+_REFERENCE_ROWS = [(random.Random(i).random(), str(i)) for i in range(2000)]
+
+def reference_work():
+    # Fixed CPU work timed next to every sample. Machine speed drifts (shared
+    # hosts, frequency scaling), so regressions are judged on the ratio of a
+    # case to this rather than on raw milliseconds.
+    sorted(_REFERENCE_ROWS)
+
+def measure(func, setup=None, repeat=20, warmup=1):
+    # Milliseconds per call; setup runs before every call and isn't timed
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+    samples = []
+    relative = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            reference_work()
+            middle = time.perf_counter()
+            func()
+            end = time.perf_counter()
+        finally:
+            gc.enable()
+        samples.append((end - middle) * 1000)
+        relative.append((end - middle) / (middle - start))
+    return {
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'mean_ms': statistics.fmean(samples),
+        'relative': statistics.median(relative),
+        'repeat': repeat
+    }
+
+def fixtures(db):
+    catalog = db.get_catalog()
+    masters = [m for m in catalog.masters if catalog.master_tasks.get(m['id'])]
+    big = max(masters, key=lambda m: len(catalog.master_tasks[m['id']]))
+    location_based = next((m for m in masters if m['location_based']), big)
+    monster = next(m for m in catalog.monsters if m['kill_limit'] != -1)
+    task = catalog.tasks[0]
+    block_task = next(row['id'] for row in catalog.master_tasks[big['id']]
+                      if row['id'] not in catalog.blocked.get(big['id'], ()))
+    return {
+        'big_master': big['id'],
+        'location_master': location_based['id'],
+        'monster': monster,
+        'task': task,
+        'block_task': block_task,
+        'location': next(iter(catalog.location_ids)),
+        'location_id': next(iter(catalog.location_ids.values())),
+        'page_after': catalog.monsters[len(catalog.monsters) // 2]['name'],
+    }
+
+def what_if_profiles(count):
+    return [{'combat_level': 40 + i * 3, 'slayer_level': 20 + i * 3} for i in range(count)]
+
+def database_cases(db):
+    # (name, method covered, func, setup)
+    f = fixtures(db)
+    profile = db.get_player_profile()
+    profiles = [PlayerProfile(dict(db.get_all_player_data(), **raw)) for raw in what_if_profiles(20)]
+    monster = f['monster']
+    names = itertools.count()
+
+    def invalidate():
+        # A no-op insert still drops every snapshot, like any catalog edit
+        db.add_task(f['task']['name'], f['task']['slayer_requirement'])
+
+    def page():
+        return list(itertools.islice(db.iter_monsters(after=f['page_after'], killable=True), 100))
+
+    cases = [
+        ('get_catalog', 'get_catalog', db.get_catalog, None),
+        ('get_catalog (cold)', 'get_catalog', db.get_catalog, invalidate),
+        ('get_all_monsters', 'get_all_monsters', db.get_all_monsters, None),
+        ('iter_monsters (page of 100)', 'iter_monsters', page, None),
+        ('iter_tasks (wilderness)', 'iter_tasks', lambda: list(db.iter_tasks(wilderness=True)), None),
+        ('get_all_tasks', 'get_all_tasks', db.get_all_tasks, None),
+        ('get_all_unlocks', 'get_all_unlocks', db.get_all_unlocks, None),
+        ('get_slayer_masters', 'get_slayer_masters', db.get_slayer_masters, None),
+        ('get_tasks_for_master', 'get_tasks_for_master',
+         lambda: db.get_tasks_for_master(f['big_master'], profile), None),
+        ('get_tasks_for_master (location based)', 'get_tasks_for_master',
+         lambda: db.get_tasks_for_master(f['location_master'], profile), None),
+        ('calculate_master_efficiency', 'calculate_master_efficiency',
+         lambda: db.calculate_master_efficiency(f['big_master'], profile), None),
+        ('calculate_all_master_efficiencies', 'calculate_all_master_efficiencies',
+         lambda: db.calculate_all_master_efficiencies(profile), None),
+        ('calculate_all_master_efficiencies (after kill)', 'calculate_all_master_efficiencies',
+         lambda: db.calculate_all_master_efficiencies(profile), lambda: db.record_kills(monster['id'], 1)),
+        ('calculate_all_master_efficiencies (cold)', 'calculate_all_master_efficiencies',
+         lambda: db.calculate_all_master_efficiencies(profile), invalidate),
+        ('get_player_profile', 'get_player_profile', db.get_player_profile, None),
+        ('get_player_profile (after write)', 'get_player_profile', db.get_player_profile,
+         lambda: db.set_player_data('slayer_points', next(names))),
+        ('get_player_data', 'get_player_data', lambda: db.get_player_data('combat_level'), None),
+        ('get_all_player_data', 'get_all_player_data', db.get_all_player_data, None),
+        ('get_accounts', 'get_accounts', db.get_accounts, None),
+        ('get_account_id', 'get_account_id', lambda: db.get_account_id('default'), None),
+        ('get_location_id', 'get_location_id', lambda: db.get_location_id(f['location']), None),
+        ('get_catalog_meta', 'get_catalog_meta', lambda: db.get_catalog_meta('seed_digest'), None),
+        ('get_seed_digests', 'get_seed_digests', db.get_seed_digests, None),
+        ('full_table_scans', 'full_table_scans', db.full_table_scans, None),
+        ('init_database (warm)', 'init_database', db.init_database, None),
+        ('suggest_blocks', 'suggest_blocks', lambda: db.suggest_blocks(f['big_master'], profile, 3), None),
+        ('calculate_what_if (20 profiles)', 'calculate_what_if',
+         lambda: db.calculate_what_if(profiles), None),
+        ('change_events (kill)', 'change_events',
+         lambda: db.change_events({('kills', db.account_id, monster['id'])}), None),
+
+        # Writes
+        ('record_kills', 'record_kills', lambda: db.record_kills(monster['id'], 1), None),
+        ('record_kill_events (100 events)', 'record_kill_events',
+         lambda: db.record_kill_events([(monster['id'], 1, 'bench', None)] * 100), None),
+        ('run_with_effects (kill)', 'run_with_effects',
+         lambda: db.run_with_effects(lambda: db.record_kills(monster['id'], 1), monster_id=monster['id']), None),
+        ('update_monster_drop_rate', 'update_monster_drop_rate',
+         lambda: db.update_monster_drop_rate(monster['id'], monster['kill_limit'] + next(names) % 2), None),
+        ('block_task', 'block_task', lambda: db.block_task(f['big_master'], f['block_task']),
+         lambda: db.unblock_task(f['big_master'], f['block_task'])),
+        ('unblock_task', 'unblock_task', lambda: db.unblock_task(f['big_master'], f['block_task']),
+         lambda: db.block_task(f['big_master'], f['block_task'])),
+        ('set_player_data', 'set_player_data', lambda: db.set_player_data('slayer_points', next(names)), None),
+        ('create_account', 'create_account', lambda: db.create_account(f'bench-{next(names)}'), None),
+        ('add_task', 'add_task', lambda: db.add_task(f'Bench task {next(names)}', 1), None),
+        ('add_location', 'add_location', lambda: db.add_location(f'Bench location {next(names)}'), None),
+        ('add_monster_location', 'add_monster_location',
+         lambda: db.add_monster_location(monster['id'], f['location_id']), None),
+        ('add_monster', 'add_monster',
+         lambda: db.add_monster(f'Bench monster {next(names)}', 100, [f['task']['id']], [f['location']]), None),
+        ('add_master_task_assignment', 'add_master_task_assignment',
+         lambda: db.add_master_task_assignment(f['big_master'], f['task']['id'], 1, 10, 20, [], None,
+                                               f'Bench location {next(names)}'), None),
+        ('add_slayer_master', 'add_slayer_master',
+         lambda: db.add_slayer_master(f'Bench master {next(names)}', 1, 1, 1, 5), None),
+        ('ingest_catalog (10 monsters)', 'ingest_catalog',
+         lambda: db.ingest_catalog(monsters=[(f'Bench monster {next(names)}', 100, [f['task']['name']], [f['location']])
+                                             for _ in range(10)]), None),
+    ]
+    if simulation_available():
+        cases.append(('simulate_master (200 x 100)', 'simulate_master',
+                      lambda: db.simulate_master(f['big_master'], profile, 200, 100, seed=1), None))
+    return cases
+
+def route_cases(web):
+    # (name, (method, path) covered, func, setup)
+    client = web.app.test_client()
+    f = fixtures(web.db)
+    monster_id = f['monster']['id']
+    master = f['big_master']
+    names = itertools.count()
+
+    def call(method, path, body=None, headers=None):
+        def request():
+            response = client.open(path, method=method, json=body() if callable(body) else body, headers=headers)
+            if response.status_code >= 400:
+                raise RuntimeError(f'{method} {path} returned {response.status_code}')
+            return response.get_data()
+        return request
+
+    def kill():
+        call('POST', f'/api/monsters/{monster_id}/kills', {'kills': 1})()
+
+    etag = client.get('/api/slayer-masters').headers['ETag']
+    block = {'master_id': master, 'task_id': f['block_task']}
+    cases = [
+        ('GET /', ('GET', '/'), call('GET', '/'), None),
+        ('GET /api/accounts', ('GET', '/api/accounts'), call('GET', '/api/accounts'), None),
+        ('GET /api/monsters', ('GET', '/api/monsters'), call('GET', '/api/monsters'), None),
+        ('GET /api/monsters (after kill)', ('GET', '/api/monsters'), call('GET', '/api/monsters'), kill),
+        ('GET /api/monsters?limit=100&killable=true', ('GET', '/api/monsters'),
+         call('GET', '/api/monsters?limit=100&killable=true'), None),
+        ('GET /api/accounts/default/monsters', ('GET', '/api/accounts/default/monsters'),
+         call('GET', '/api/accounts/default/monsters'), None),
+        ('GET /api/all-tasks', ('GET', '/api/all-tasks'), call('GET', '/api/all-tasks'), None),
+        ('GET /api/all-tasks?wilderness=true', ('GET', '/api/all-tasks'),
+         call('GET', '/api/all-tasks?wilderness=true'), None),
+        ('GET /api/unlocks', ('GET', '/api/unlocks'), call('GET', '/api/unlocks'), None),
+        ('GET /api/slayer-masters', ('GET', '/api/slayer-masters'), call('GET', '/api/slayer-masters'), None),
+        ('GET /api/slayer-masters (after kill)', ('GET', '/api/slayer-masters'),
+         call('GET', '/api/slayer-masters'), kill),
+        ('GET /api/slayer-masters (If-None-Match)', ('GET', '/api/slayer-masters'),
+         call('GET', '/api/slayer-masters', headers={'If-None-Match': etag}), None),
+        ('GET /api/slayer-masters/<id>/tasks', ('GET', f'/api/slayer-masters/{master}/tasks'),
+         call('GET', f'/api/slayer-masters/{master}/tasks'), None),
+        ('GET /api/slayer-masters/<id>/tasks (after kill)', ('GET', f'/api/slayer-masters/{master}/tasks'),
+         call('GET', f'/api/slayer-masters/{master}/tasks'), kill),
+        ('GET /api/slayer-masters/<location based>/tasks', ('GET', f'/api/slayer-masters/{f["location_master"]}/tasks'),
+         call('GET', f'/api/slayer-masters/{f["location_master"]}/tasks'), None),
+        ('GET /api/slayer-masters/<id>/block-suggestions', ('GET', f'/api/slayer-masters/{master}/block-suggestions'),
+         call('GET', f'/api/slayer-masters/{master}/block-suggestions?slots=3'), None),
+        ('GET /api/player-data', ('GET', '/api/player-data'), call('GET', '/api/player-data'), None),
+        ('POST /api/player-data', ('POST', '/api/player-data'),
+         call('POST', '/api/player-data', lambda: {'slayer_points': next(names)}), None),
+        ('POST /api/accounts', ('POST', '/api/accounts'),
+         call('POST', '/api/accounts', lambda: {'name': f'route-{next(names)}'}), None),
+        ('POST /api/monsters/<id>/kills', ('POST', f'/api/monsters/{monster_id}/kills'),
+         call('POST', f'/api/monsters/{monster_id}/kills', {'kills': 1}), None),
+        ('POST /api/monsters/<id>/kills?effects=true', ('POST', f'/api/monsters/{monster_id}/kills'),
+         call('POST', f'/api/monsters/{monster_id}/kills?effects=true', {'kills': 1}), None),
+        ('POST /api/kill-events (100 events)', ('POST', '/api/kill-events'),
+         call('POST', '/api/kill-events', {'events': [{'monster_id': monster_id, 'kills': 1}] * 100}), None),
+        ('PUT /api/monsters/<id>/drop-rate', ('PUT', f'/api/monsters/{monster_id}/drop-rate'),
+         call('PUT', f'/api/monsters/{monster_id}/drop-rate',
+              lambda: {'kill_limit': f['monster']['kill_limit'] + next(names) % 2}), None),
+        ('POST /api/block-task', ('POST', '/api/block-task'), call('POST', '/api/block-task', block),
+         call('POST', '/api/unblock-task', block)),
+        ('POST /api/unblock-task', ('POST', '/api/unblock-task'), call('POST', '/api/unblock-task', block),
+         call('POST', '/api/block-task', block)),
+        ('POST /api/what-if (20 profiles)', ('POST', '/api/what-if'),
+         call('POST', '/api/what-if', {'profiles': what_if_profiles(20)}), None),
+        ('POST /api/tasks', ('POST', '/api/tasks'),
+         call('POST', '/api/tasks', lambda: {'name': f'Route task {next(names)}'}), None),
+        ('POST /api/monsters', ('POST', '/api/monsters'),
+         call('POST', '/api/monsters', lambda: {'name': f'Route monster {next(names)}', 'kill_limit': 100,
+                                                'task_ids': [f['task']['id']], 'locations': [f['location']]}), None),
+        ('POST /api/init-common-tasks (unchanged seed)', ('POST', '/api/init-common-tasks'),
+         call('POST', '/api/init-common-tasks'), None),
+    ]
+    if simulation_available():
+        cases.append(('GET /api/slayer-masters/<id>/simulation (200 x 100)',
+                      ('GET', f'/api/slayer-masters/{master}/simulation'),
+                      call('GET', f'/api/slayer-masters/{master}/simulation?runs=200&length=100&seed=1'), None))
+    return cases
+
+def regressed(result, base, tolerance):
+    # Slower both in absolute terms and relative to the reference work
+    return (result['median_ms'] - base['median_ms'] > MIN_DELTA_MS and
+            result['relative'] > base['relative'] * (1 + tolerance))
+
+def run_cases(cases, repeat, only, results, baseline, tolerance):
+    for name, _, func, setup in cases:
+        if only and only not in name:
+            continue
+        result = measure(func, setup, repeat)
+        # Re-measure before believing a slowdown, keeping the fastest run, so a
+        # noisy neighbour doesn't fail the whole suite
+        base = baseline.get(name)
+        rechecks = 0
+        while base is not None and rechecks < RECHECKS and regressed(result, base, tolerance):
+            result = min(result, measure(func, setup, repeat), key=itemgetter('median_ms'))
+            rechecks += 1
+        results[name] = result
+        print(f'{name:70} {result["median_ms"]:10.3f} ms', file=sys.stderr)
+
+def uncovered_methods(cases):
+    public = {name for name in dir(SlayerDatabase)
+              if not name.startswith('_') and callable(getattr(SlayerDatabase, name))}
+    return sorted(public - {method for _, method, _, _ in cases} - set(SKIPPED_METHODS))
+
+def uncovered_routes(web, cases):
+    adapter = web.app.url_map.bind('localhost')
+    covered = {(adapter.match(path, method=method)[0], method) for _, (method, path), _, _ in cases}
+    routes = {(rule.endpoint, method) for rule in web.app.url_map.iter_rules()
+              for method in rule.methods - {'HEAD', 'OPTIONS'}}
+    return sorted(f'{method} {endpoint}' for endpoint, method in routes - covered
+                  if endpoint not in SKIPPED_ROUTES)
+
+def compare(results, baseline, tolerance):
+    # Annotates results with the baseline and returns the names that regressed
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        result['baseline_median_ms'] = base['median_ms']
+        result['ratio'] = result['relative'] / base['relative']
+        if regressed(result, base, tolerance):
+            regressions.append(name)
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the slayer tracker on a synthetic catalog')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='large')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', help='run only cases whose name contains this')
+    parser.add_argument('--output', help='results JSON (default benchmarks/results/<scale>.json)')
+    parser.add_argument('--baseline', help='baseline JSON (default benchmarks/baselines/<scale>.json)')
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f'{args.scale}.json')
+    output_path = args.output or os.path.join(RESULTS_DIR, f'{args.scale}.json')
+    baseline = {}
+    if not args.update_baseline and os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)['results']
+    work = tempfile.mkdtemp(prefix='slayer-bench-')
+    results = {}
+    try:
+        template = os.path.join(work, 'template.db')
+        start = time.perf_counter()
+        params = build_database(template, args.scale, args.seed)
+        print(f'built {args.scale} catalog in {time.perf_counter() - start:.1f} s', file=sys.stderr)
+
+        # Each phase gets its own copy, so one phase's writes don't skew the other
+        shutil.copy(template, os.path.join(work, 'methods.db'))
+        db = SlayerDatabase(os.path.join(work, 'methods.db'))
+        cases = database_cases(db)
+        run_cases(cases, args.repeat, args.only, results, baseline, args.tolerance)
+        missing_methods = uncovered_methods(cases)
+        db.close()
+
+        os.makedirs(os.path.join(work, 'routes'))
+        shutil.copy(template, os.path.join(work, 'routes', 'slayer_tracker.db'))
+        cwd = os.getcwd()
+        os.chdir(os.path.join(work, 'routes'))
+        try:
+            import app as web
+            cases = route_cases(web)
+            run_cases(cases, args.repeat, args.only, results, baseline, args.tolerance)
+            missing_routes = uncovered_routes(web, cases)
+            web.db.close()
+        finally:
+            os.chdir(cwd)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'scale': args.scale,
+            'catalog': params,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'numpy': simulation_available(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+        },
+        'uncovered': {'methods': missing_methods, 'routes': missing_routes},
+        'results': results
+    }
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+        print(f'baseline written to {baseline_path}', file=sys.stderr)
+    regressions = report['regressions'] = compare(results, baseline, args.tolerance)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+
+    for kind, names in report['uncovered'].items():
+        if names:
+            print(f'not benchmarked ({kind}): {", ".join(names)}', file=sys.stderr)
+    for name in regressions:
+        result = results[name]
+        print(f'REGRESSION {name}: {result["median_ms"]:.3f} ms vs {result["baseline_median_ms"]:.3f} ms',
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
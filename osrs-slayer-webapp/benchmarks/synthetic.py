@@ -0,0 +1,93 @@
+import random
+
+from database import SlayerDatabase
+
+# Synthetic catalogs shaped like the real one, only bigger: monsters on one or
+# two tasks and a few locations (some in the wilderness), masters assigning a
+# random slice of the tasks, Konar-style masters fanning every task out into
+# one row per location, a Krystilia-style wilderness master, and quest and
+# Slayer unlock requirements on some assignments.
+
+SCALES = {
+    'small': {'monsters': 1000, 'tasks': 200, 'masters': 12, 'locations': 100, 'fanout': 3},
+    'large': {'monsters': 10000, 'tasks': 2000, 'masters': 50, 'locations': 500, 'fanout': 4},
+}
+
+QUESTS = [f'Quest {i}' for i in range(30)]
+SLAYER_UNLOCKS = [f'Unlock {i}' for i in range(20)]
+WILDERNESS_SHARE = 0.08
+UNLIMITED_SHARE = 0.4
+
+def generate_catalog(monsters, tasks, masters, locations, fanout, seed=0):
+    # (masters, tasks, monsters, assignments) in the shapes add_slayer_master
+    # and ingest_catalog take
+    rng = random.Random(seed)
+
+    location_names = [f'Wilderness Location {i}' if rng.random() < WILDERNESS_SHARE else f'Location {i}'
+                      for i in range(locations)]
+    task_rows = [(f'Task {i:05d}', rng.randint(1, 99)) for i in range(tasks)]
+
+    monster_rows = []
+    locations_by_task = {}
+    for i in range(monsters):
+        # Every task gets at least one monster, the rest are spread at random
+        task_names = [task_rows[i % tasks][0]] + ([rng.choice(task_rows)[0]] if rng.random() < 0.3 else [])
+        monster_locations = rng.sample(location_names, rng.randint(1, 3))
+        kill_limit = -1 if rng.random() < UNLIMITED_SHARE else rng.randint(50, 5000)
+        monster_rows.append((f'Monster {i:06d}', kill_limit, task_names, monster_locations))
+        for task_name in task_names:
+            locations_by_task.setdefault(task_name, set()).update(monster_locations)
+
+    master_rows = []
+    assignments = []
+    for i in range(masters):
+        location_based = i % 10 == 9
+        wilderness = i == 1
+        name = f'Master {i:03d}'
+        points = rng.randint(0, 20)
+        master_rows.append((name, rng.randint(0, 100), rng.randint(1, 90), points, points * 5, location_based))
+
+        for task_name, _ in rng.sample(task_rows, min(tasks, rng.randint(50, 400))):
+            if location_based:
+                restrictions = sorted(locations_by_task.get(task_name, ()))[:fanout] or [None]
+            elif wilderness:
+                restrictions = ['Wilderness']
+            else:
+                restrictions = [None]
+            min_amount = rng.randint(10, 100)
+            quest_unlocks = [rng.choice(QUESTS)] if rng.random() < 0.1 else []
+            slayer_unlock = rng.choice(SLAYER_UNLOCKS) if rng.random() < 0.1 else None
+            for restriction in restrictions:
+                assignments.append((name, task_name, rng.randint(1, 20), min_amount,
+                                    min_amount + rng.randint(0, 150), quest_unlocks, slayer_unlock, restriction))
+
+    return master_rows, task_rows, monster_rows, assignments
+
+def build_database(path, scale='large', seed=0):
+    # A fresh database at `path` holding the synthetic catalog plus a played
+    # account: kills on some limited monsters, a few blocks and a mid-game profile
+    params = SCALES[scale]
+    master_rows, task_rows, monster_rows, assignments = generate_catalog(seed=seed, **params)
+
+    db = SlayerDatabase(path)
+    for master in master_rows:
+        db.add_slayer_master(*master)
+    db.ingest_catalog(task_rows, monster_rows, assignments)
+
+    rng = random.Random(seed + 1)
+    catalog = db.get_catalog()
+    events = [(monster['id'], rng.randint(1, monster['kill_limit']), 'synthetic', None)
+              for monster in catalog.monsters if monster['kill_limit'] != -1 and rng.random() < 0.2]
+    db.record_kill_events(events)
+    for master_id, rows in catalog.master_tasks.items():
+        task_ids = sorted({row['id'] for row in rows})
+        for task_id in rng.sample(task_ids, min(len(task_ids), 3)):
+            db.block_task(master_id, task_id)
+
+    db.set_player_data('combat_level', 100)
+    db.set_player_data('slayer_level', 85)
+    db.set_player_data('completed_quests', QUESTS[::2])
+    db.set_player_data('slayer_unlocks', SLAYER_UNLOCKS[::2])
+    db.set_player_data('block_slots', 6)
+    db.close()
+    return params
@@ -0,0 +1,170 @@
+import json
+from functools import cached_property
+
+# Loading a snapshot always takes exactly this many queries, whatever the size
+# of the catalog: the shared catalog once, then the state of each account read.
+# Reads served from a warm snapshot take none.
+CATALOG_QUERY_BUDGET = 7
+ACCOUNT_QUERY_BUDGET = 2
+
+STRUCTURAL_INDEXES = ('masters_by_monster', 'wilderness_monsters', 'unlocks')
+
+class CatalogSnapshot:
+    # Immutable, indexed copy of the game data plus kill counts and blocks.
+    # Nothing in here is mutated after construction: writes build a new
+    # snapshot with the with_* helpers and swap it in. The shared catalog has
+    # no kills or blocks; with_state lays one account's over it.
+    def __init__(self, version, masters, tasks, master_tasks, monsters, kills,
+                 monsters_by_task, tasks_by_monster, locations_by_monster, location_ids, blocked):
+        self.version = version
+        self.masters = masters                            # ordered by combat requirement
+        self.masters_by_id = {m['id']: m for m in masters}
+        self.tasks = tasks                                # ordered by name
+        self.tasks_by_id = {t['id']: t for t in tasks}
+        self.master_tasks = master_tasks                  # master id -> task rows
+        self.monsters = monsters                          # ordered by name
+        self.monsters_by_id = {m['id']: m for m in monsters}
+        self.kills = kills                                # monster id -> kills
+        self.monsters_by_task = monsters_by_task          # task id -> monster ids
+        self.tasks_by_monster = tasks_by_monster          # monster id -> task ids
+        self.locations_by_monster = locations_by_monster  # monster id -> ((name, is_wilderness), ...)
+        self.location_ids = location_ids                  # location name -> id
+        self.blocked = blocked                            # master id -> frozenset of task ids
+
+    @cached_property
+    def masters_by_monster(self):
+        # Dependency index: the masters whose efficiency a monster's kill count
+        # or drop rate can change, via task_monsters and master_tasks
+        masters_by_task = {}
+        for master_id, rows in self.master_tasks.items():
+            for row in rows:
+                masters_by_task.setdefault(row['id'], set()).add(master_id)
+        return {monster_id: frozenset(master_id for task_id in task_ids
+                                      for master_id in masters_by_task.get(task_id, ()))
+                for monster_id, task_ids in self.tasks_by_monster.items()}
+
+    @cached_property
+    def wilderness_monsters(self):
+        return frozenset(
+            monster_id for monster_id, locs in self.locations_by_monster.items()
+            if any(is_wilderness for _, is_wilderness in locs))
+
+    @cached_property
+    def unlocks(self):
+        quests = set()
+        slayer_unlocks = set()
+        for rows in self.master_tasks.values():
+            for row in rows:
+                quests.update(row['quest_unlocks'])
+                if row['slayer_unlock'] is not None:
+                    slayer_unlocks.add(row['slayer_unlock'])
+        return {'quests': sorted(quests), 'slayer_unlocks': sorted(slayer_unlocks)}
+
+    def _replace(self, version, **changes):
+        fields = dict(
+            masters=self.masters, tasks=self.tasks, master_tasks=self.master_tasks,
+            monsters=self.monsters, kills=self.kills, monsters_by_task=self.monsters_by_task,
+            tasks_by_monster=self.tasks_by_monster, locations_by_monster=self.locations_by_monster,
+            location_ids=self.location_ids, blocked=self.blocked)
+        fields.update(changes)
+        snapshot = CatalogSnapshot(version, **fields)
+        # The with_* helpers never touch task links, locations or master_tasks,
+        # so indexes derived from those can be carried over as they are
+        for name in STRUCTURAL_INDEXES:
+            if name in self.__dict__:
+                snapshot.__dict__[name] = self.__dict__[name]
+        return snapshot
+
+    def with_state(self, version, kills, blocked):
+        # Build the structural indexes here first so every account shares them
+        for name in STRUCTURAL_INDEXES:
+            getattr(self, name)
+        return self._replace(version, kills=kills, blocked=blocked)
+
+    def with_monster(self, version, monster):
+        # monster is None when the row no longer exists
+        if monster is None:
+            return self._replace(version)
+        monsters = tuple(monster if m['id'] == monster['id'] else m for m in self.monsters)
+        return self._replace(version, monsters=monsters)
+
+    def with_kills(self, version, deltas):
+        # deltas: monster id -> kills to add on top of the current counts
+        monster_kills = dict(self.kills)
+        for monster_id, kills in deltas.items():
+            monster_kills[monster_id] = monster_kills.get(monster_id, 0) + kills
+        return self._replace(version, kills=monster_kills)
+
+    def with_blocked(self, version, master_id, task_ids):
+        blocked = dict(self.blocked)
+        blocked[master_id] = frozenset(task_ids)
+        return self._replace(version, blocked=blocked)
+
+def load_catalog(conn, version):
+    masters = tuple(dict(row) for row in conn.execute(
+        'SELECT * FROM slayer_masters ORDER BY combat_requirement'))
+
+    tasks = tuple(dict(row) for row in conn.execute(
+        'SELECT id, name, slayer_requirement FROM tasks ORDER BY name'))
+
+    master_tasks = {}
+    for row in conn.execute('''
+        SELECT mt.slayer_master_id, t.id, t.name, t.slayer_requirement,
+               mt.weight, mt.min_amount, mt.max_amount,
+               mt.quest_unlocks, mt.slayer_unlock, mt.location_restriction,
+               sm.combat_requirement
+        FROM master_tasks mt
+        JOIN tasks t ON mt.task_id = t.id
+        JOIN slayer_masters sm ON mt.slayer_master_id = sm.id
+        ORDER BY mt.slayer_master_id, t.name, mt.location_restriction
+    '''):
+        task_row = dict(row)
+        task_row['quest_unlocks'] = tuple(json.loads(row['quest_unlocks'])) if row['quest_unlocks'] else ()
+        master_tasks.setdefault(row['slayer_master_id'], []).append(task_row)
+    master_tasks = {master_id: tuple(rows) for master_id, rows in master_tasks.items()}
+
+    monsters = tuple(dict(row) for row in conn.execute(
+        'SELECT id, name, kill_limit FROM monsters ORDER BY name'))
+
+    monsters_by_task = {}
+    for row in conn.execute('SELECT task_id, monster_id FROM task_monsters ORDER BY task_id, monster_id'):
+        monsters_by_task.setdefault(row['task_id'], []).append(row['monster_id'])
+
+    tasks_by_monster = {}
+    for row in conn.execute('''
+        SELECT tm.monster_id, tm.task_id
+        FROM task_monsters tm
+        JOIN tasks t ON tm.task_id = t.id
+        ORDER BY t.name
+    '''):
+        tasks_by_monster.setdefault(row['monster_id'], []).append(row['task_id'])
+
+    locations_by_monster = {}
+    location_ids = {}
+    for row in conn.execute('''
+        SELECT l.id, l.name, l.is_wilderness, ml.monster_id
+        FROM locations l
+        LEFT JOIN monster_locations ml ON ml.location_id = l.id
+        ORDER BY l.name
+    '''):
+        location_ids[row['name']] = row['id']
+        if row['monster_id'] is not None:
+            locations_by_monster.setdefault(row['monster_id'], []).append((row['name'], row['is_wilderness']))
+
+    return CatalogSnapshot(
+        version, masters, tasks, master_tasks, monsters, {},
+        {task_id: tuple(ids) for task_id, ids in monsters_by_task.items()},
+        {monster_id: tuple(ids) for monster_id, ids in tasks_by_monster.items()},
+        {monster_id: tuple(locs) for monster_id, locs in locations_by_monster.items()},
+        location_ids, {})
+
+def load_account_state(conn, account_id):
+    # (kills, blocked) for one account, in the shapes CatalogSnapshot uses
+    kills = {row['monster_id']: row['kills'] for row in conn.execute(
+        'SELECT monster_id, kills FROM kills WHERE account_id = ?', (account_id,))}
+
+    blocked = {}
+    for row in conn.execute('SELECT slayer_master_id, task_id FROM blocked_tasks WHERE account_id = ?', (account_id,)):
+        blocked.setdefault(row['slayer_master_id'], set()).add(row['task_id'])
+
+    return kills, {master_id: frozenset(ids) for master_id, ids in blocked.items()}
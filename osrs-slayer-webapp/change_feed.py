@@ -0,0 +1,62 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+class Subscription:
+    # One listener's queue of change sets. If it falls more than max_pending
+    # sets behind, the backlog is dropped and it gets a single ('full',) so the
+    # listener reloads instead of the publisher ever blocking.
+    def __init__(self, max_pending):
+        self._queue = queue.Queue(max_pending)
+        self._overflowed = threading.Event()
+
+    def put(self, changes):
+        try:
+            self._queue.put_nowait(changes)
+        except queue.Full:
+            self._overflowed.set()
+
+    def get(self, timeout):
+        # Everything queued, merged into one set; None if nothing came in time
+        try:
+            changes = set(self._queue.get(timeout=timeout))
+        except queue.Empty:
+            return None
+        while True:
+            try:
+                changes.update(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if self._overflowed.is_set():
+            self._overflowed.clear()
+            return {('full',)}
+        return changes
+
+class ChangeFeed:
+    # Fan-out of committed change sets (the same change kinds as
+    # SlayerDatabase._note_change) to everyone subscribed, e.g. SSE streams
+    def __init__(self, max_pending=256):
+        self.max_pending = max_pending
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def publish(self, changes):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        changes = frozenset(changes)
+        for subscription in subscriptions:
+            subscription.put(changes)
+
+    @contextmanager
+    def subscribe(self, subscription=None):
+        # Anything with a non-blocking put(changes) can subscribe; it is called
+        # from the committing thread
+        if subscription is None:
+            subscription = Subscription(self.max_pending)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions.discard(subscription)
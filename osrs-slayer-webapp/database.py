@@ -1,721 +1,1237 @@
 import sqlite3
 import json
+import threading
+import atexit
+import os
+from collections import OrderedDict
+from bisect import bisect_right
+from contextlib import contextmanager
 from datetime import datetime
+from operator import itemgetter
 import math
 
+from catalog import load_catalog, load_account_state
+from migrations import SCHEMA_VERSION, HOT_QUERIES, migrate, schema_version
+from efficiency import (is_assignable, can_kill_by_count, can_kill_by_location, completion_chance,
+                        effective_weights, calculate_efficiencies, calculate_profile_efficiencies,
+                        optimize_blocks, task_doability, EfficiencyCache)
+from write_behind import KillBuffer
+from change_feed import ChangeFeed
+from simulation import compile_master_model, simulate_assignments, default_workers
+from player import LIST_KEYS, PLAYER_DEFAULTS, PlayerProfile, as_profile, clean_player_value
+
+class ConnectionPool:
+    # Keeps a small stack of open SQLite connections so requests don't pay the
+    # connect + pragma cost every time. While a thread is inside connection()
+    # or transaction() it is pinned to one connection, so nested calls share it.
+    def __init__(self, db_name, max_idle=8, busy_timeout_ms=5000,
+                 cache_size_kb=16384, mmap_size=256 * 1024 * 1024):
+        self.db_name = db_name
+        self.max_idle = max_idle
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connect(self):
+        # isolation_level=None: we issue BEGIN/COMMIT ourselves in transaction()
+        conn = sqlite3.connect(self.db_name, timeout=self.busy_timeout_ms / 1000,
+                               isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute(f'PRAGMA cache_size = -{int(self.cache_size_kb)}')
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+
+        self._local.conn = conn
+        self._local.depth = 0
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            if conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    @contextmanager
+    def transaction(self):
+        # Outermost block owns BEGIN/COMMIT, nested blocks become savepoints so
+        # a failing inner step can be rolled back without losing the rest.
+        with self.connection() as conn:
+            depth = self._local.depth
+            savepoint = f'sp_{depth}'
+            conn.execute('BEGIN IMMEDIATE' if depth == 0 else f'SAVEPOINT {savepoint}')
+            self._local.depth = depth + 1
+            try:
+                yield conn
+            except BaseException:
+                if depth == 0:
+                    conn.execute('ROLLBACK')
+                else:
+                    conn.execute(f'ROLLBACK TO {savepoint}')
+                    conn.execute(f'RELEASE {savepoint}')
+                raise
+            else:
+                conn.execute('COMMIT' if depth == 0 else f'RELEASE {savepoint}')
+            finally:
+                self._local.depth = depth
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+class ChangeLog:
+    # Cross-process half of the change tracking, for workers forked off one
+    # parent and sharing the database file. Each write transaction appends its
+    # change set to change_log; before reading its snapshots a process replays
+    # what the others wrote. PRAGMA data_version on a private connection says
+    # whether anyone committed since the last look, so an idle log costs no
+    # query against the table.
+    PRUNE_EVERY = 1000
+    KEEP = 10000
+
+    def __init__(self, db_name, seen):
+        self.db_name = db_name
+        self.seen = seen            # last seq replayed (or written before we started)
+        self._conn = None
+        self._data_version = None
+        self._lock = threading.Lock()
+
+    def append(self, conn, changes):
+        # Inside the writer's transaction, so the entry commits with the data
+        cursor = conn.execute('INSERT INTO change_log (origin, changes) VALUES (?, ?)',
+                              (os.getpid(), json.dumps(sorted(changes))))
+        if cursor.lastrowid % self.PRUNE_EVERY == 0:
+            conn.execute('DELETE FROM change_log WHERE seq <= ?', (cursor.lastrowid - self.KEEP,))
+
+    def poll(self):
+        # Changes other processes committed since the last poll, possibly empty
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_name, isolation_level=None, check_same_thread=False)
+            data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version == self._data_version:
+                return set()
+            self._data_version = data_version
+
+            changes = set()
+            origin = os.getpid()
+            for seq, writer, entry in self._conn.execute(
+                    'SELECT seq, origin, changes FROM change_log WHERE seq > ? ORDER BY seq', (self.seen,)):
+                if seq != self.seen + 1:
+                    # Pruned past what we last saw
+                    changes.add(('full',))
+                if writer != origin:
+                    changes.update(tuple(change) for change in json.loads(entry))
+                self.seen = seq
+            return changes
+
+    def close(self):
+        # Before fork: SQLite connections must not cross into the child
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._data_version = None
+
+DEFAULT_ACCOUNT_ID = 1
+
+def _matches_filters(catalog, monster_ids, location, wilderness, killable):
+    # Filters of the paged listings; None means don't filter. A task is in a
+    # location, in the wilderness or killable if any of its monsters is.
+    monster_ids = [monster_id for monster_id in monster_ids if monster_id in catalog.monsters_by_id]
+    if location is not None and not any(
+            name == location for monster_id in monster_ids
+            for name, _ in catalog.locations_by_monster.get(monster_id, ())):
+        return False
+    if wilderness is not None and wilderness != any(
+            monster_id in catalog.wilderness_monsters for monster_id in monster_ids):
+        return False
+    if killable is not None and killable != any(
+            catalog.monsters_by_id[monster_id]['kill_limit'] == -1 or
+            catalog.kills.get(monster_id, 0) < catalog.monsters_by_id[monster_id]['kill_limit']
+            for monster_id in monster_ids):
+        return False
+    return True
+
+class AccountState:
+    # Per-account caches. Lives in DatabaseState's LRU and is simply dropped
+    # when evicted; everything in it can be rebuilt from the database.
+    def __init__(self, version):
+        self.catalog = None             # shared catalog + this account's kills and blocks
+        self.efficiency_cache = EfficiencyCache()
+        self.profile = None
+        self.profile_version = version
+
+class DatabaseState:
+    # What every account handle on one database shares: the pool, the catalog
+    # snapshot, the version counter, the kill buffer, the change feed and the
+    # account LRU.
+    def __init__(self, pool, max_accounts):
+        self.pool = pool
+        self.local = threading.local()
+        self.lock = threading.RLock()
+        self.catalog = None             # shared catalog, no kills or blocks
+        self.data_version = 0
+        self.kill_buffer = None
+        self.feed = ChangeFeed()
+        self.change_log = None
+        self.cpu_executor = None
+        self.max_accounts = max_accounts
+        self.accounts = OrderedDict()   # account id -> AccountState, least recent first
+        self.account_ids = {}           # account name -> id, filled in as names are looked up
+        self._accounts_lock = threading.Lock()
+
+    def account(self, account_id):
+        with self._accounts_lock:
+            state = self.accounts.get(account_id)
+            if state is None:
+                state = self.accounts[account_id] = AccountState(self.data_version)
+                if len(self.accounts) > self.max_accounts:
+                    self.accounts.popitem(last=False)
+            else:
+                self.accounts.move_to_end(account_id)
+            return state
+
+    def live_accounts(self):
+        with self._accounts_lock:
+            return list(self.accounts.items())
+
 class SlayerDatabase:
-    def __init__(self, db_name='slayer_tracker.db'):
+    # One handle per account. The handle from the constructor is the default
+    # account; account() hands out others that share the same DatabaseState.
+    def __init__(self, db_name='slayer_tracker.db', max_accounts=256, **pool_options):
         self.db_name = db_name
+        self._bind(DatabaseState(ConnectionPool(db_name, **pool_options), max_accounts), DEFAULT_ACCOUNT_ID)
         self.init_database()
+
+    def _bind(self, state, account_id):
+        self._state = state
+        self.pool = state.pool
+        self._local = state.local
+        self._catalog_lock = state.lock
+        self.account_id = account_id
+
+    def account(self, account_id):
+        if account_id == self.account_id:
+            return self
+        handle = SlayerDatabase.__new__(SlayerDatabase)
+        handle.db_name = self.db_name
+        handle._bind(self._state, account_id)
+        return handle
+
+    @property
+    def data_version(self):
+        return self._state.data_version
+
+    def _account_state(self):
+        return self._state.account(self.account_id)
     
     def get_connection(self):
-        conn = sqlite3.connect(self.db_name)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return self.pool.connection()
+
+    @contextmanager
+    def transaction(self):
+        # Writes record what they touched in _local.changes; once the outermost
+        # transaction commits the catalog snapshots are patched (or dropped).
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            self._local.changes = set()
+        self._local.depth = depth + 1
+        try:
+            with self.pool.transaction() as conn:
+                yield conn
+                change_log = self._state.change_log
+                if depth == 0 and change_log is not None and self._local.changes:
+                    change_log.append(conn, self._local.changes)
+        except BaseException:
+            if depth == 0:
+                # Rolled back: nothing changed, so the snapshots still hold and
+                # there is nothing to tell subscribers
+                self._local.changes = None
+            raise
+        else:
+            if depth == 0:
+                changes, self._local.changes = self._local.changes, None
+                self._apply_catalog_changes(changes, own_commit=True)
+                if changes:
+                    self._state.feed.publish(changes)
+        finally:
+            self._local.depth = depth
+
+    def close(self):
+        self.disable_write_behind()
+        self.pool.close()
+
+    # Accounts
+    def get_accounts(self):
+        with self.get_connection() as conn:
+            return [dict(row) for row in conn.execute('SELECT id, name, created_at FROM accounts ORDER BY id')]
+
+    def get_account_id(self, name):
+        # Accounts are never removed, so a cached id stays right; a name we
+        # don't know may have been created since, possibly by another worker
+        account_ids = self._state.account_ids
+        account_id = account_ids.get(name)
+        if account_id is None:
+            with self.get_connection() as conn:
+                row = conn.execute('SELECT id FROM accounts WHERE name = ?', (name,)).fetchone()
+            if row is None:
+                return None
+            account_id = row['id']
+            self._state.account_ids = {**account_ids, name: account_id}
+        return account_id
+
+    def create_account(self, name):
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute('INSERT INTO accounts (name) VALUES (?)', (name,))
+                account_id = cursor.lastrowid
+                cursor.executemany('INSERT INTO player_data (account_id, key, value) VALUES (?, ?, ?)',
+                                   [(account_id, key, value) for key, value in PLAYER_DEFAULTS.items()])
+            return True, account_id
+        except sqlite3.IntegrityError:
+            return False, "Account already exists!"
+
+    # Catalog snapshot
+    def _note_change(self, *change):
+        # Only valid inside transaction(). Catalog-wide: ('full',) and
+        # ('monster', id); per account: ('kills', account, monster),
+        # ('master', account, master) and ('player', account)
+        self._local.changes.add(change)
+
+    def _pending_kills(self, account_id=None):
+        buffer = self._state.kill_buffer
+        if buffer is None:
+            return {}
+        return buffer.totals(self.account_id if account_id is None else account_id)
+
+    def _apply_catalog_changes(self, changes, own_commit=False):
+        if not changes:
+            return
+
+        with self._catalog_lock:
+            before = self._account_state().catalog if own_commit else None
+            self._patch_snapshots(changes)
+            if own_commit:
+                self._note_snapshots(before, self._account_state().catalog)
+
+    def _note_snapshots(self, before, after):
+        # Hands run_with_effects the snapshots either side of its own commit
+        snapshots = getattr(self._local, 'snapshots', None)
+        if snapshots is not None:
+            snapshots.append((before, after))
+
+    def _patch_snapshots(self, changes):
+        # Only called with the catalog lock held
+        state = self._state
+        state.data_version += 1
+        version = state.data_version
+        if ('full',) in changes:
+            state.catalog = None
+            for _, account in state.live_accounts():
+                account.catalog = None
+                account.profile = None
+                account.profile_version = version
+                account.efficiency_cache.invalidate(None, changes, version)
+            return
+
+        # Re-read the touched rows so the patches reflect what is committed
+        # now, plus any kills still waiting in the write-behind buffer
+        with self.get_connection() as conn:
+            monster_ids = sorted(key[1] for key in changes if key[0] == 'monster')
+            static = state.catalog
+            for monster_id in monster_ids:
+                if static is None:
+                    break
+                monster = conn.execute('SELECT id, name, kill_limit FROM monsters WHERE id = ?', (monster_id,)).fetchone()
+                if monster is not None and monster['id'] not in static.monsters_by_id:
+                    static = None
+                else:
+                    static = static.with_monster(version, dict(monster) if monster else None)
+            state.catalog = static
+
+            for account_id, account in state.live_accounts():
+                if ('player', account_id) in changes:
+                    account.profile = None
+                    account.profile_version = version
+
+                killed = [key[2] for key in changes if key[0] == 'kills' and key[1] == account_id]
+                blocked = [key[2] for key in changes if key[0] == 'master' and key[1] == account_id]
+                touched = ({('monster', monster_id) for monster_id in monster_ids + killed} |
+                           {('master', master_id) for master_id in blocked})
+                if not touched:
+                    continue
+
+                snapshot = account.catalog
+                account.efficiency_cache.invalidate(snapshot, touched, version)
+                if snapshot is None or static is None:
+                    account.catalog = None
+                    continue
+
+                kills = dict(snapshot.kills)
+                pending = self._pending_kills(account_id) if killed else {}
+                for monster_id in killed:
+                    row = conn.execute('SELECT kills FROM kills WHERE account_id = ? AND monster_id = ?',
+                                       (account_id, monster_id)).fetchone()
+                    kills[monster_id] = (row['kills'] if row else 0) + pending.get(monster_id, 0)
+                blocks = dict(snapshot.blocked)
+                for master_id in blocked:
+                    blocks[master_id] = frozenset(row['task_id'] for row in conn.execute(
+                        'SELECT task_id FROM blocked_tasks WHERE account_id = ? AND slayer_master_id = ?',
+                        (account_id, master_id)))
+                account.catalog = static.with_state(version, kills, blocks)
+
+    def get_catalog(self):
+        if getattr(self._local, 'changes', None):
+            # Uncommitted writes on this thread: read them back from our own connection
+            with self._catalog_lock:
+                with self.get_connection() as conn:
+                    return self._load_account(load_catalog(conn, self.data_version), conn)
+        self.replay_change_log()
+
+        account = self._account_state()
+        snapshot = account.catalog
+        if snapshot is not None:
+            return snapshot
+
+        with self._catalog_lock:
+            if account.catalog is None:
+                state = self._state
+                with self.get_connection() as conn:
+                    if state.catalog is None:
+                        state.catalog = load_catalog(conn, self.data_version)
+                    account.catalog = self._load_account(state.catalog, conn)
+            return account.catalog
+
+    # Multi-process mode
+    def enable_change_log(self):
+        # Record every write in change_log and replay the other processes'
+        # writes. Turn on before warming the snapshots that get shared by fork.
+        state = self._state
+        if state.change_log is None:
+            with self.get_connection() as conn:
+                seen = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM change_log').fetchone()[0]
+            state.change_log = ChangeLog(self.pool.db_name, seen)
+
+    def prepare_fork(self):
+        # Leave nothing in this process a forked child can't use: the buffer
+        # thread (flushed first) and every open SQLite connection
+        self.disable_write_behind()
+        self.pool.close()
+        if self._state.change_log is not None:
+            self._state.change_log.close()
+
+    def replay_change_log(self):
+        # Apply and publish what other processes committed; reads do this
+        # themselves, anything waiting on subscribe_changes has to poll
+        change_log = self._state.change_log
+        if change_log is None:
+            return
+        changes = change_log.poll()
+        if changes:
+            self._apply_catalog_changes(changes)
+            self._state.feed.publish(changes)
+
+    def _load_account(self, static, conn):
+        # Call with _catalog_lock held so buffered kills can't be flushed mid-load
+        kills, blocked = load_account_state(conn, self.account_id)
+        for monster_id, pending in self._pending_kills().items():
+            kills[monster_id] = kills.get(monster_id, 0) + pending
+        return static.with_state(self.data_version, kills, blocked)
+
+    def subscribe_changes(self, subscription=None):
+        # Context manager yielding a Subscription to every committed change set
+        return self._state.feed.subscribe(subscription)
+
+    def change_events(self, changes):
+        # (event, data) pairs telling a client of this account what a change
+        # set did, read from the current snapshot: changed monsters, new block
+        # lists, the player profile and the efficiencies of affected masters
+        if ('full',) in changes:
+            return [('reload', {})]
+
+        account_id = self.account_id
+        catalog = self.get_catalog()
+        player_info = self.get_player_profile()
+        events = []
+        master_ids = set()
+
+        monster_ids = ({key[1] for key in changes if key[0] == 'monster'} |
+                       {key[2] for key in changes if key[0] == 'kills' and key[1] == account_id})
+        for monster_id in sorted(monster_ids):
+            monster = catalog.monsters_by_id.get(monster_id)
+            if monster is not None:
+                events.append(('monster', self._monster_view(catalog, monster)))
+                master_ids.update(catalog.masters_by_monster.get(monster_id, ()))
+
+        for master_id in sorted(key[2] for key in changes if key[0] == 'master' and key[1] == account_id):
+            events.append(('blocked', {'master_id': master_id,
+                                       'task_ids': sorted(catalog.blocked.get(master_id, ()))}))
+            master_ids.add(master_id)
+
+        if ('player', account_id) in changes:
+            events.append(('player', player_info.to_dict()))
+            master_ids = None
+
+        if master_ids is None or master_ids:
+            events.append(('efficiency', self.calculate_all_master_efficiencies(
+                player_info, None if master_ids is None else sorted(master_ids))))
+        return events
+
+    def run_with_effects(self, write, monster_id=None, master_id=None):
+        # (write(), effects): what a write to one monster or one master's blocks
+        # did for this account, diffed between the snapshots taken either side
+        # of its commit under the catalog lock, so other commits don't leak in.
+        # Everything reported is read from that one `after` snapshot.
+        current = self.get_catalog()
+        self._local.snapshots = []
+        try:
+            result = write()
+        finally:
+            snapshots, self._local.snapshots = self._local.snapshots, None
+        before = snapshots[0][0] if snapshots and snapshots[0][0] is not None else current
+        after = snapshots[-1][1] if snapshots and snapshots[-1][1] is not None else self.get_catalog()
+
+        effects = {}
+        if monster_id is not None:
+            monster = after.monsters_by_id.get(monster_id)
+            effects['monster'] = None if monster is None else self._monster_view(after, monster)
+            master_ids = sorted(after.masters_by_monster.get(monster_id, ()))
+        else:
+            effects['blocked'] = {'master_id': master_id,
+                                  'task_ids': sorted(after.blocked.get(master_id, ()))}
+            master_ids = [master_id] if master_id in after.masters_by_id else []
+
+        # Blocks never change doability, kills and drop rates only for the
+        # tasks the monster is on
+        doability = []
+        for changed_master_id in master_ids if monster_id is not None else ():
+            location_based = after.masters_by_id[changed_master_id]['location_based']
+            # Keyed rather than zipped: a catalog reload in between may reorder them
+            old_rows = {(row['id'], row['location_restriction']): row
+                        for row in before.master_tasks.get(changed_master_id, ())}
+            for row in after.master_tasks.get(changed_master_id, ()):
+                old_row = old_rows.get((row['id'], row['location_restriction']))
+                if old_row is None or monster_id not in after.monsters_by_task.get(row['id'], ()):
+                    continue
+                old = task_doability(before, old_row, location_based)
+                can_do, doable_chance = task_doability(after, row, location_based)
+                if old != (can_do, doable_chance):
+                    doability.append({
+                        'master_id': changed_master_id,
+                        'task_id': row['id'],
+                        'location_restriction': row['location_restriction'],
+                        'can_do': can_do,
+                        'doable_chance': doable_chance
+                    })
+        effects['doability'] = doability
+        effects['efficiencies'] = self._efficiencies(after, self.get_player_profile(), master_ids)
+        return result, effects
+
+    @contextmanager
+    def count_queries(self):
+        # Collects every statement run on this thread's connection while the
+        # block is open, so read paths can be held to their query budgets.
+        statements = []
+        with self.get_connection() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                yield statements
+            finally:
+                conn.set_trace_callback(None)
     
     def init_database(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Create tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS monsters (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                kill_limit INTEGER NOT NULL,
-                added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS kills (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                monster_id INTEGER,
-                kills INTEGER DEFAULT 0,
-                FOREIGN KEY (monster_id) REFERENCES monsters (id),
-                UNIQUE(monster_id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS slayer_masters (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                combat_requirement INTEGER DEFAULT 0,
-                slayer_requirement INTEGER DEFAULT 0,
-                points_per_task INTEGER DEFAULT 0,
-                points_per_10th INTEGER DEFAULT 0,
-                location_based INTEGER DEFAULT 0
-            )
-        ''')
-        
-        # Add location_based column if it doesn't exist
-        cursor.execute("PRAGMA table_info(slayer_masters)")
-        columns = [row[1] for row in cursor.fetchall()]
-        if 'location_based' not in columns:
-            cursor.execute("ALTER TABLE slayer_masters ADD COLUMN location_based INTEGER DEFAULT 0")
-        
-        # Locations table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS locations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                is_wilderness INTEGER DEFAULT 0
-            )
-        ''')
-        
-        # Which monsters are found in which locations
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS monster_locations (
-                monster_id INTEGER,
-                location_id INTEGER,
-                FOREIGN KEY (monster_id) REFERENCES monsters (id),
-                FOREIGN KEY (location_id) REFERENCES locations (id),
-                PRIMARY KEY (monster_id, location_id)
-            )
-        ''')
-        
-        # Global tasks table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                slayer_requirement INTEGER DEFAULT 1
-            )
-        ''')
-
-        # Check and correct master_tasks schema
-        cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='master_tasks'")
-        table_sql_row = cursor.fetchone()
-        if table_sql_row and "UNIQUE(slayer_master_id, task_id, location_restriction)" not in table_sql_row['sql']:
-            cursor.execute("DROP TABLE master_tasks")
-            conn.commit()
-
-        # Which masters can assign which tasks
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS master_tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                slayer_master_id INTEGER,
-                task_id INTEGER,
-                weight INTEGER DEFAULT 1,
-                min_amount INTEGER DEFAULT 10,
-                max_amount INTEGER DEFAULT 50,
-                quest_unlocks TEXT,
-                slayer_unlock TEXT,
-                location_restriction TEXT,
-                FOREIGN KEY (slayer_master_id) REFERENCES slayer_masters (id),
-                FOREIGN KEY (task_id) REFERENCES tasks (id),
-                UNIQUE(slayer_master_id, task_id, location_restriction)
-            )
-        ''')
-        
-        # Add location_restriction column if it doesn't exist (for fresh dbs)
-        cursor.execute("PRAGMA table_info(master_tasks)")
-        columns = [row[1] for row in cursor.fetchall()]
-        if 'location_restriction' not in columns:
-            cursor.execute("ALTER TABLE master_tasks ADD COLUMN location_restriction TEXT")
-        
-        # Which monsters belong to which tasks
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS task_monsters (
-                task_id INTEGER,
-                monster_id INTEGER,
-                FOREIGN KEY (task_id) REFERENCES tasks (id),
-                FOREIGN KEY (monster_id) REFERENCES monsters (id),
-                PRIMARY KEY (task_id, monster_id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS player_data (
-                key TEXT PRIMARY KEY,
-                value TEXT
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS blocked_tasks (
-                slayer_master_id INTEGER,
-                task_id INTEGER,
-                FOREIGN KEY (slayer_master_id) REFERENCES slayer_masters (id),
-                FOREIGN KEY (task_id) REFERENCES tasks (id),
-                PRIMARY KEY (slayer_master_id, task_id)
-            )
-        ''')
-        
-        # Initialize slayer masters if they don't exist
-        masters = [
-            ('Turael', 0, 1, 0, 0, 0),
-            ('Mazchna', 20, 1, 2, 5, 0),
-            ('Vannaka', 40, 1, 4, 20, 0),
-            ('Chaeldar', 70, 1, 10, 50, 0),
-            ('Nieve', 85, 1, 12, 60, 0),
-            ('Duradel', 100, 50, 15, 75, 0),
-            ('Krystilia', 0, 1, 25, 125, 0),
-            ('Spria', 0, 1, 0, 0, 0),
-            ('Konar', 75, 1, 18, 90, 1)
-        ]
-        
-        for master in masters:
-            cursor.execute('''
-                INSERT OR IGNORE INTO slayer_masters 
-                (name, combat_requirement, slayer_requirement, points_per_task, points_per_10th, location_based)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', master)
-        
-        # Initialize player data with defaults
-        player_defaults = {
-            'slayer_points': '0',
-            'task_streak': '0',
-            'combat_level': '3',
-            'slayer_level': '1',
-            'completed_quests': '[]',
-            'slayer_unlocks': '[]',
-            'block_slots': '0'
-        }
-        for key, value in player_defaults.items():
-            cursor.execute('INSERT OR IGNORE INTO player_data (key, value) VALUES (?, ?)', (key, value))
+        # Warm start: the schema is current, so don't even take the write lock
+        with self.get_connection() as conn:
+            if schema_version(conn) >= SCHEMA_VERSION:
+                return
+
+        with self.transaction() as conn:
+            # Re-checked under the write lock in case another process migrated first
+            if migrate(conn):
+                self._note_change('full')
+
+    def full_table_scans(self):
+        # (query, plan detail) for every hot query SQLite would answer with a full scan
+        scans = []
+        with self.get_connection() as conn:
+            for sql in HOT_QUERIES:
+                params = (1,) * sql.count('?')
+                for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params):
+                    if row['detail'].startswith('SCAN '):
+                        scans.append((sql, row['detail']))
+        return scans
 
-        conn.commit()
-        conn.close()
-    
     # Location Management
     def add_location(self, name, is_wilderness=False):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('INSERT OR IGNORE INTO locations (name, is_wilderness) VALUES (?, ?)', 
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('INSERT OR IGNORE INTO locations (name, is_wilderness) VALUES (?, ?)',
                           (name, 1 if is_wilderness else 0))
-            conn.commit()
+            self._note_change('full')
             return cursor.lastrowid
-        finally:
-            conn.close()
-    
+
     def add_monster_location(self, monster_id, location_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('INSERT OR IGNORE INTO monster_locations (monster_id, location_id) VALUES (?, ?)',
-                          (monster_id, location_id))
-            conn.commit()
-        finally:
-            conn.close()
-    
+        with self.transaction() as conn:
+            conn.execute('INSERT OR IGNORE INTO monster_locations (monster_id, location_id) VALUES (?, ?)',
+                         (monster_id, location_id))
+            self._note_change('full')
+
     def get_location_id(self, location_name):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT id FROM locations WHERE name = ?', (location_name,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        return row['id'] if row else None
+        return self.get_catalog().location_ids.get(location_name)
     
     # Monster Management
     def add_monster(self, name, kill_limit, task_ids, locations=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            # Insert monster
-            cursor.execute('INSERT INTO monsters (name, kill_limit) VALUES (?, ?)', 
-                          (name, kill_limit))
-            monster_id = cursor.lastrowid
-            
-            # Initialize kill counter
-            cursor.execute('INSERT INTO kills (monster_id, kills) VALUES (?, 0)', 
-                          (monster_id,))
-            
-            # Link monster to tasks
-            for task_id in task_ids:
-                cursor.execute('INSERT INTO task_monsters (task_id, monster_id) VALUES (?, ?)',
-                              (task_id, monster_id))
-            
-            # Link monster to locations if provided
-            if locations:
-                for location_name in locations:
-                    location_id = self.get_location_id(location_name)
-                    if not location_id:
-                        # Create location if it doesn't exist
-                        is_wilderness = 'wilderness' in location_name.lower()
-                        cursor.execute('INSERT INTO locations (name, is_wilderness) VALUES (?, ?)',
-                                      (location_name, 1 if is_wilderness else 0))
-                        location_id = cursor.lastrowid
-                    
-                    cursor.execute('INSERT OR IGNORE INTO monster_locations (monster_id, location_id) VALUES (?, ?)',
-                                  (monster_id, location_id))
-            
-            conn.commit()
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+
+                # Insert monster
+                cursor.execute('INSERT INTO monsters (name, kill_limit) VALUES (?, ?)', 
+                              (name, kill_limit))
+                monster_id = cursor.lastrowid
+                
+                # Link monster to tasks
+                for task_id in task_ids:
+                    cursor.execute('INSERT INTO task_monsters (task_id, monster_id) VALUES (?, ?)',
+                                  (task_id, monster_id))
+                
+                # Link monster to locations if provided
+                if locations:
+                    for location_name in locations:
+                        # Look up on this connection, the location may have been added earlier in the same transaction
+                        row = cursor.execute('SELECT id FROM locations WHERE name = ?', (location_name,)).fetchone()
+                        location_id = row['id'] if row else None
+                        if not location_id:
+                            # Create location if it doesn't exist
+                            is_wilderness = 'wilderness' in location_name.lower()
+                            cursor.execute('INSERT INTO locations (name, is_wilderness) VALUES (?, ?)',
+                                          (location_name, 1 if is_wilderness else 0))
+                            location_id = cursor.lastrowid
+                        
+                        cursor.execute('INSERT OR IGNORE INTO monster_locations (monster_id, location_id) VALUES (?, ?)',
+                                      (monster_id, location_id))
+
+                self._note_change('full')
+
             return True, "Monster added successfully!"
         except sqlite3.IntegrityError:
             return False, "Monster already exists!"
         except Exception as e:
-            conn.rollback()
             return False, f"Error: {str(e)}"
-        finally:
-            conn.close()
     
     def update_monster_drop_rate(self, monster_id, new_kill_limit):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('UPDATE monsters SET kill_limit = ? WHERE id = ?',
-                          (new_kill_limit, monster_id))
-            conn.commit()
+            with self.transaction() as conn:
+                conn.execute('UPDATE monsters SET kill_limit = ? WHERE id = ?',
+                             (new_kill_limit, monster_id))
+                self._note_change('monster', monster_id)
             return True, "Drop rate updated successfully!"
         except Exception as e:
             return False, f"Error: {str(e)}"
-        finally:
-            conn.close()
     
+    def _monster_view(self, catalog, monster):
+        current_kills = catalog.kills.get(monster['id'], 0)
+        return {
+            'id': monster['id'],
+            'name': monster['name'],
+            'kill_limit': monster['kill_limit'],
+            'current_kills': current_kills,
+            'remaining': -1 if monster['kill_limit'] == -1 else monster['kill_limit'] - current_kills,
+            'tasks': [{'id': task_id, 'name': catalog.tasks_by_id[task_id]['name']}
+                      for task_id in catalog.tasks_by_monster.get(monster['id'], ())],
+            'locations': [{'name': name, 'is_wilderness': is_wilderness}
+                          for name, is_wilderness in catalog.locations_by_monster.get(monster['id'], ())]
+        }
+
     def get_all_monsters(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT m.id, m.name, m.kill_limit, COALESCE(k.kills, 0) as current_kills
-            FROM monsters m
-            LEFT JOIN kills k ON m.id = k.monster_id
-            ORDER BY m.name
-        ''')
-        
-        monsters = []
-        for row in cursor.fetchall():
-            # Get tasks for this monster
-            cursor.execute('''
-                SELECT t.id, t.name
-                FROM task_monsters tm
-                JOIN tasks t ON tm.task_id = t.id
-                WHERE tm.monster_id = ?
-                ORDER BY t.name
-            ''', (row['id'],))
-            
-            tasks = [{'id': task['id'], 'name': task['name']} for task in cursor.fetchall()]
-            
-            # Get locations for this monster
-            cursor.execute('''
-                SELECT l.name, l.is_wilderness
-                FROM monster_locations ml
-                JOIN locations l ON ml.location_id = l.id
-                WHERE ml.monster_id = ?
-                ORDER BY l.name
-            ''', (row['id'],))
-            
-            locations = [{'name': loc['name'], 'is_wilderness': loc['is_wilderness']} for loc in cursor.fetchall()]
-            
-            monsters.append({
-                'id': row['id'],
-                'name': row['name'],
-                'kill_limit': row['kill_limit'],
-                'current_kills': row['current_kills'],
-                'remaining': -1 if row['kill_limit'] == -1 else row['kill_limit'] - row['current_kills'],
-                'tasks': tasks,
-                'locations': locations
-            })
-        
-        conn.close()
-        return monsters
+        catalog = self.get_catalog()
+        return [self._monster_view(catalog, monster) for monster in catalog.monsters]
+
+    def iter_monsters(self, after=None, task_id=None, location=None, wilderness=None, killable=None):
+        # Keyset scan: monsters whose name sorts after `after` (names are
+        # unique), in name order, one at a time from a single snapshot
+        catalog = self.get_catalog()
+        monsters = catalog.monsters
+        start = 0 if after is None else bisect_right(monsters, after, key=itemgetter('name'))
+        for index in range(start, len(monsters)):
+            monster = monsters[index]
+            if task_id is not None and task_id not in catalog.tasks_by_monster.get(monster['id'], ()):
+                continue
+            if _matches_filters(catalog, (monster['id'],), location, wilderness, killable):
+                yield self._monster_view(catalog, monster)
     
-    def record_kills(self, monster_id, kills):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE kills 
-            SET kills = kills + ? 
-            WHERE monster_id = ?
-        ''', (kills, monster_id))
-        
-        if cursor.rowcount == 0:
-            cursor.execute('INSERT INTO kills (monster_id, kills) VALUES (?, ?)', 
-                          (monster_id, kills))
-        
-        conn.commit()
-        conn.close()
+    def record_kills(self, monster_id, kills, source='manual'):
+        if not self._buffer_kills(monster_id, kills, source):
+            self.record_kill_events([(monster_id, kills, source, None)])
+        return True
+
+    # Write-behind kill buffer, shared by every account on the database
+    def enable_write_behind(self, max_pending=1000, max_delay=1.0):
+        # Optional mode for high-frequency kill tracking: record_kills only
+        # updates memory and the buffer writes coalesced events in batches.
+        state = self._state
+        if state.kill_buffer is None:
+            state.kill_buffer = KillBuffer(self.flush_kills, max_pending, max_delay)
+            atexit.register(self.close)
+
+    def disable_write_behind(self):
+        state = self._state
+        buffer = state.kill_buffer
+        if buffer is None:
+            return
+        buffer.close()
+        with self._catalog_lock:
+            self.flush_kills()
+            state.kill_buffer = None
+        atexit.unregister(self.close)
+
+    def _buffer_kills(self, monster_id, kills, source):
+        # Patch the snapshot in the same step as buffering, so every read sees
+        # the kill straight away even though it isn't in the database yet
+        state = self._state
+        with self._catalog_lock:
+            if state.kill_buffer is None:
+                return False
+            state.kill_buffer.add(self.account_id, monster_id, kills, source)
+            state.data_version += 1
+            account = self._account_state()
+            snapshot = account.catalog
+            account.efficiency_cache.invalidate(snapshot, {('monster', monster_id)}, state.data_version)
+            if snapshot is not None:
+                account.catalog = snapshot.with_kills(state.data_version, {monster_id: kills})
+            self._note_snapshots(snapshot, account.catalog)
+        state.feed.publish({('kills', self.account_id, monster_id)})
         return True
+
+    def flush_kills(self):
+        buffer = self._state.kill_buffer
+        if buffer is None:
+            return 0
+        # Held across the write so no snapshot is rebuilt while the flushed
+        # kills are in neither the buffer nor the database
+        with self._catalog_lock:
+            events = buffer.take()
+            if not events:
+                return 0
+            by_account = {}
+            for account_id, monster_id, kills, source, recorded_at in events:
+                by_account.setdefault(account_id, []).append((monster_id, kills, source, recorded_at))
+            try:
+                with self.transaction():
+                    for account_id, account_events in by_account.items():
+                        self.account(account_id).record_kill_events(account_events)
+            except Exception:
+                buffer.restore(events)
+                raise
+        return len(events)
+
+    def record_kill_events(self, events):
+        # events: (monster_id, kills, source, recorded_at or None for now).
+        # Appends every event to the kill log and folds the per-monster totals
+        # into the kills aggregate, all in one transaction and one commit.
+        totals = {}
+        for monster_id, kills, _, _ in events:
+            totals[monster_id] = totals.get(monster_id, 0) + kills
+
+        account_id = self.account_id
+        with self.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO kill_events (account_id, monster_id, kills, source, recorded_at)
+                VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            ''', [(account_id,) + tuple(event) for event in events])
+            conn.executemany('''
+                INSERT INTO kills (account_id, monster_id, kills) VALUES (?, ?, ?)
+                ON CONFLICT (account_id, monster_id) DO UPDATE SET kills = kills + excluded.kills
+            ''', [(account_id, monster_id, kills) for monster_id, kills in totals.items()])
+
+            for monster_id in totals:
+                self._note_change('kills', account_id, monster_id)
+
+        return len(events), len(totals)
     
     # Task Management
+    def add_slayer_master(self, name, combat_requirement, slayer_requirement,
+                          points_per_task, points_per_10th, location_based=False):
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO slayer_masters
+                    (name, combat_requirement, slayer_requirement, points_per_task, points_per_10th, location_based)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (name, combat_requirement, slayer_requirement, points_per_task, points_per_10th,
+                      1 if location_based else 0))
+                self._note_change('full')
+            return True, cursor.lastrowid
+        except sqlite3.IntegrityError:
+            return False, "Slayer master already exists!"
+
     def add_task(self, name, slayer_requirement):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                INSERT OR IGNORE INTO tasks (name, slayer_requirement)
-                VALUES (?, ?)
-            ''', (name, slayer_requirement))
-            
-            conn.commit()
+            with self.transaction() as conn:
+                conn.execute('''
+                    INSERT OR IGNORE INTO tasks (name, slayer_requirement)
+                    VALUES (?, ?)
+                ''', (name, slayer_requirement))
+                self._note_change('full')
             return True, "Task added successfully!"
         except sqlite3.IntegrityError:
             return False, "Task already exists!"
         except Exception as e:
             return False, str(e)
-        finally:
-            conn.close()
     
     def add_master_task_assignment(self, slayer_master_id, task_id, weight, min_amount, max_amount, quest_unlocks, slayer_unlock, location_restriction=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                INSERT OR IGNORE INTO master_tasks 
-                (slayer_master_id, task_id, weight, min_amount, max_amount, quest_unlocks, slayer_unlock, location_restriction)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (slayer_master_id, task_id, weight, min_amount, max_amount, json.dumps(quest_unlocks), slayer_unlock, location_restriction))
-            
-            conn.commit()
+            with self.transaction() as conn:
+                conn.execute('''
+                    INSERT OR IGNORE INTO master_tasks 
+                    (slayer_master_id, task_id, weight, min_amount, max_amount, quest_unlocks, slayer_unlock, location_restriction)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (slayer_master_id, task_id, weight, min_amount, max_amount, json.dumps(quest_unlocks), slayer_unlock, location_restriction))
+                self._note_change('full')
             return True
         except Exception as e:
             return False
-        finally:
-            conn.close()
 
-    def get_tasks_for_master(self, master_id, player_info=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    # Bulk Ingestion
+    def ingest_catalog(self, tasks=(), monsters=(), assignments=(), replace=False):
+        # Loads a whole catalog in one transaction with executemany.
+        #   tasks:       (name, slayer_requirement)
+        #   monsters:    (name, kill_limit, task_names, location_names)
+        #   assignments: (master_name, task_name, weight, min_amount, max_amount,
+        #                 quest_unlocks, slayer_unlock, location_restriction)
+        # Rows that already exist are counted as skipped when identical and as
+        # conflicts when they differ. With replace=True differing rows are
+        # updated instead (and monsters get any missing links added). Monsters
+        # and assignments naming no known task or master are counted as unlinked.
+        counts = {kind: {'inserted': 0, 'updated': 0, 'skipped': 0, 'conflicts': 0, 'unlinked': 0}
+                  for kind in ('tasks', 'locations', 'monsters', 'assignments')}
 
-        # Get master info
-        cursor.execute('SELECT name, location_based FROM slayer_masters WHERE id = ?', (master_id,))
-        master_info = cursor.fetchone()
-        is_location_based = master_info['location_based'] if master_info else False
+        def name_map(conn, sql):
+            return {row[0]: row[1] for row in conn.execute(sql)}
 
-        cursor.execute('''
-            SELECT t.id, t.name, t.slayer_requirement,
-                   mt.weight, mt.min_amount, mt.max_amount,
-                   mt.quest_unlocks, mt.slayer_unlock, mt.location_restriction,
-                   sm.combat_requirement
-            FROM master_tasks mt
-            JOIN tasks t ON mt.task_id = t.id
-            JOIN slayer_masters sm ON mt.slayer_master_id = sm.id
-            WHERE mt.slayer_master_id = ?
-            ORDER BY t.name, mt.location_restriction
-        ''', (master_id,))
+        with self.transaction() as conn:
+            # Tasks
+            existing = name_map(conn, 'SELECT name, slayer_requirement FROM tasks')
+            new_tasks = []
+            updated_tasks = []
+            for name, slayer_requirement in tasks:
+                if name in existing:
+                    if existing[name] == slayer_requirement:
+                        counts['tasks']['skipped'] += 1
+                    elif replace:
+                        updated_tasks.append((slayer_requirement, name))
+                    else:
+                        counts['tasks']['conflicts'] += 1
+                    continue
+                existing[name] = slayer_requirement
+                new_tasks.append((name, slayer_requirement))
+            conn.executemany('INSERT INTO tasks (name, slayer_requirement) VALUES (?, ?)', new_tasks)
+            conn.executemany('UPDATE tasks SET slayer_requirement = ? WHERE name = ?', updated_tasks)
+            counts['tasks']['inserted'] = len(new_tasks)
+            counts['tasks']['updated'] = len(updated_tasks)
+            task_ids = name_map(conn, 'SELECT name, id FROM tasks')
 
-        tasks = []
-        for row in cursor.fetchall():
-            task_id = row['id']
+            # Monsters, skipping any that don't belong to a known task
+            existing = name_map(conn, 'SELECT name, kill_limit FROM monsters')
+            existing_links = {}
+            if replace and monsters:
+                # A replaced monster is only unchanged if it already has every link
+                for name, task_id in conn.execute('''
+                    SELECT m.name, tm.task_id FROM task_monsters tm JOIN monsters m ON m.id = tm.monster_id
+                '''):
+                    existing_links.setdefault(name, set()).add(('task', task_id))
+                for name, location_name in conn.execute('''
+                    SELECT m.name, l.name FROM monster_locations ml
+                    JOIN monsters m ON m.id = ml.monster_id
+                    JOIN locations l ON l.id = ml.location_id
+                '''):
+                    existing_links.setdefault(name, set()).add(('location', location_name))
+            new_monsters = []
+            updated_monsters = []
+            for name, kill_limit, task_names, location_names in monsters:
+                linked = [task_ids[task_name] for task_name in task_names if task_name in task_ids]
+                if name in existing:
+                    links = ({('task', task_id) for task_id in linked} |
+                             {('location', location_name) for location_name in location_names or []})
+                    if existing[name] == kill_limit and (not replace or links <= existing_links.get(name, set())):
+                        counts['monsters']['skipped'] += 1
+                    elif replace:
+                        updated_monsters.append((name, kill_limit, linked, location_names or []))
+                    else:
+                        counts['monsters']['conflicts'] += 1
+                    continue
+                if not linked:
+                    counts['monsters']['unlinked'] += 1
+                    continue
+                existing[name] = kill_limit
+                new_monsters.append((name, kill_limit, linked, location_names or []))
+            linked_monsters = new_monsters + updated_monsters
 
-            # Basic requirements check
-            is_assignable = True
-            if player_info:
-                # Check combat and slayer levels
-                if player_info['combat_level'] < row['combat_requirement']: is_assignable = False
-                if player_info['slayer_level'] < row['slayer_requirement']: is_assignable = False
+            # Locations of the new monsters
+            existing = name_map(conn, 'SELECT name, id FROM locations')
+            new_locations = []
+            seen = set()
+            for _, _, _, location_names in linked_monsters:
+                for location_name in location_names:
+                    if location_name in seen:
+                        continue
+                    seen.add(location_name)
+                    if location_name in existing:
+                        counts['locations']['skipped'] += 1
+                        continue
+                    new_locations.append((location_name, 1 if 'wilderness' in location_name.lower() else 0))
+            conn.executemany('INSERT INTO locations (name, is_wilderness) VALUES (?, ?)', new_locations)
+            counts['locations']['inserted'] = len(new_locations)
 
-                # Check quest unlocks (must have all)
-                quest_unlocks = json.loads(row['quest_unlocks']) if row['quest_unlocks'] else []
-                if not all(q in player_info['completed_quests'] for q in quest_unlocks):
-                    is_assignable = False
+            conn.executemany('INSERT INTO monsters (name, kill_limit) VALUES (?, ?)',
+                             [(name, kill_limit) for name, kill_limit, _, _ in new_monsters])
+            conn.executemany('UPDATE monsters SET kill_limit = ? WHERE name = ?',
+                             [(kill_limit, name) for name, kill_limit, _, _ in updated_monsters])
+            counts['monsters']['inserted'] = len(new_monsters)
+            counts['monsters']['updated'] = len(updated_monsters)
 
-                # Check slayer unlock (must have it if specified)
-                if row['slayer_unlock'] and row['slayer_unlock'] not in player_info['slayer_unlocks']:
-                    is_assignable = False
+            if linked_monsters:
+                monster_ids = name_map(conn, 'SELECT name, id FROM monsters')
+                location_ids = name_map(conn, 'SELECT name, id FROM locations')
+                conn.executemany('INSERT OR IGNORE INTO task_monsters (task_id, monster_id) VALUES (?, ?)',
+                                 [(task_id, monster_ids[name]) for name, _, linked, _ in linked_monsters
+                                  for task_id in linked])
+                conn.executemany('INSERT OR IGNORE INTO monster_locations (monster_id, location_id) VALUES (?, ?)',
+                                 [(monster_ids[name], location_ids[location_name])
+                                  for name, _, _, location_names in linked_monsters
+                                  for location_name in location_names])
 
-            # Get monsters for this task
-            cursor.execute('''
-                SELECT m.id, m.name, m.kill_limit, COALESCE(k.kills, 0) as current_kills
-                FROM task_monsters tm
-                JOIN monsters m ON tm.monster_id = m.id
-                LEFT JOIN kills k ON m.id = k.monster_id
-                WHERE tm.task_id = ?
-            ''', (task_id,))
+            # Master assignments, keyed like the UNIQUE constraint (NULL restrictions included)
+            master_ids = name_map(conn, 'SELECT name, id FROM slayer_masters')
+            existing = {}
+            for row in conn.execute('''
+                SELECT slayer_master_id, task_id, location_restriction,
+                       weight, min_amount, max_amount, quest_unlocks, slayer_unlock
+                FROM master_tasks
+            '''):
+                existing[(row[0], row[1], row[2])] = tuple(row[3:])
+
+            new_assignments = []
+            updated_assignments = []
+            for (master_name, task_name, weight, min_amount, max_amount,
+                 quest_unlocks, slayer_unlock, location_restriction) in assignments:
+                if master_name not in master_ids or task_name not in task_ids:
+                    counts['assignments']['unlinked'] += 1
+                    continue
+                key = (master_ids[master_name], task_ids[task_name], location_restriction)
+                values = (weight, min_amount, max_amount, json.dumps(quest_unlocks), slayer_unlock)
+                if key in existing:
+                    if existing[key] == values:
+                        counts['assignments']['skipped'] += 1
+                    elif replace:
+                        updated_assignments.append(values + key)
+                    else:
+                        counts['assignments']['conflicts'] += 1
+                    continue
+                existing[key] = values
+                new_assignments.append(key[:2] + values + (location_restriction,))
+            conn.executemany('''
+                INSERT INTO master_tasks
+                (slayer_master_id, task_id, weight, min_amount, max_amount, quest_unlocks, slayer_unlock, location_restriction)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', new_assignments)
+            conn.executemany('''
+                UPDATE master_tasks
+                SET weight = ?, min_amount = ?, max_amount = ?, quest_unlocks = ?, slayer_unlock = ?
+                WHERE slayer_master_id = ? AND task_id = ? AND location_restriction IS ?
+            ''', updated_assignments)
+            counts['assignments']['inserted'] = len(new_assignments)
+            counts['assignments']['updated'] = len(updated_assignments)
+
+            self._note_change('full')
+
+        return counts
+
+    def get_catalog_meta(self, key):
+        with self.get_connection() as conn:
+            row = conn.execute('SELECT value FROM catalog_meta WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else None
+
+    def get_seed_digests(self):
+        # (kind, key) -> digest of the seed row last applied for it
+        with self.get_connection() as conn:
+            return {(row['kind'], row['key']): row['digest']
+                    for row in conn.execute('SELECT kind, key, digest FROM seed_rows')}
+
+    def record_seed(self, digest, row_digests):
+        with self.transaction() as conn:
+            conn.executemany('INSERT OR REPLACE INTO seed_rows (kind, key, digest) VALUES (?, ?, ?)',
+                             [(kind, key, row_digest) for (kind, key), row_digest in row_digests.items()])
+            conn.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('seed_digest', ?)", (digest,))
+
+    def get_tasks_for_master(self, master_id, player_info=None):
+        player_info = as_profile(player_info)
+        catalog = self.get_catalog()
+        master_info = catalog.masters_by_id.get(master_id)
+        is_location_based = master_info['location_based'] if master_info else False
+        blocked_task_ids = catalog.blocked.get(master_id, frozenset())
+
+        rows = catalog.master_tasks.get(master_id, ())
+        assignable = [is_assignable(row, player_info) for row in rows]
+        weights = effective_weights(rows, assignable, is_location_based)
 
+        tasks = []
+        for row, row_assignable, weight in zip(rows, assignable, weights):
+            task_id = row['id']
             monsters = []
             can_do_task = False
-            avg_task_size = (row['min_amount'] + row['max_amount']) / 2
+            doable_chance = 0.0
             
-            for monster_row in cursor.fetchall():
-                kill_limit = monster_row['kill_limit']
-                current_kills = monster_row['current_kills']
-                remaining_kills = -1 if kill_limit == -1 else kill_limit - current_kills
-                
-                # Check if monster can be killed based on kills remaining
-                can_kill_by_count = remaining_kills == -1 or remaining_kills >= avg_task_size
-                
-                # Check location restrictions
-                can_kill_by_location = True
-                if row['location_restriction']:
-                    # Get monster locations
-                    cursor.execute('''
-                        SELECT l.name, l.is_wilderness
-                        FROM monster_locations ml
-                        JOIN locations l ON ml.location_id = l.id
-                        WHERE ml.monster_id = ?
-                    ''', (monster_row['id'],))
-                    
-                    monster_locations = cursor.fetchall()
-                    
-                    if row['location_restriction'] == 'Wilderness':
-                        # For Krystilia - monster must be in Wilderness
-                        can_kill_by_location = any(loc['is_wilderness'] for loc in monster_locations)
-                    elif is_location_based:
-                        # For Konar - monster must be in the specific location
-                        can_kill_by_location = any(loc['name'] == row['location_restriction'] for loc in monster_locations)
+            for monster_id in catalog.monsters_by_task.get(task_id, ()):
+                monster = catalog.monsters_by_id.get(monster_id)
+                if monster is None:
+                    continue
+                kill_limit = monster['kill_limit']
+                current_kills = catalog.kills.get(monster_id, 0)
                 
-                can_kill = can_kill_by_count and can_kill_by_location
+                by_count = can_kill_by_count(kill_limit, current_kills, row)
+                by_location = can_kill_by_location(catalog, monster_id, row, is_location_based)
+                can_kill = by_count and by_location
+                chance = completion_chance(kill_limit, current_kills, row) if by_location else 0.0
                 
                 if can_kill:
                     can_do_task = True
+                doable_chance = max(doable_chance, chance)
                 
                 monsters.append({
-                    'id': monster_row['id'],
-                    'name': monster_row['name'],
+                    'id': monster_id,
+                    'name': monster['name'],
                     'kill_limit': kill_limit,
                     'current_kills': current_kills,
                     'can_kill': can_kill,
-                    'can_kill_by_count': can_kill_by_count,
-                    'can_kill_by_location': can_kill_by_location
+                    'can_kill_by_count': by_count,
+                    'can_kill_by_location': by_location,
+                    'completion_chance': chance
                 })
 
-            # Check if task is blocked
-            cursor.execute('SELECT 1 FROM blocked_tasks WHERE slayer_master_id = ? AND task_id = ?', (master_id, task_id))
-            is_blocked = cursor.fetchone() is not None
-
             tasks.append({
                 'id': row['id'],
                 'name': row['name'],
-                'weight': row['weight'],
+                'weight': weight,
                 'min_amount': row['min_amount'],
                 'max_amount': row['max_amount'],
                 'slayer_requirement': row['slayer_requirement'],
-                'quest_unlocks': json.loads(row['quest_unlocks']) if row['quest_unlocks'] else [],
+                'quest_unlocks': list(row['quest_unlocks']),
                 'slayer_unlock': row['slayer_unlock'],
                 'location_restriction': row['location_restriction'],
                 'monsters': monsters,
                 'can_do': can_do_task,
-                'is_blocked': is_blocked,
-                'is_assignable': is_assignable
+                'doable_chance': doable_chance,
+                'is_blocked': task_id in blocked_task_ids,
+                'is_assignable': row_assignable
             })
             
-        # For Konar, distribute the task weight among unlocked locations
-        if is_location_based:
-            grouped_tasks = {}
-            for task in tasks:
-                if task['name'] not in grouped_tasks:
-                    grouped_tasks[task['name']] = []
-                grouped_tasks[task['name']].append(task)
-
-            processed_tasks = []
-            for task_name, task_group in grouped_tasks.items():
-                base_weight = task_group[0]['weight'] if task_group else 0
-                
-                # A location is viable for weight distribution if the task can be assigned
-                assignable_locations = [t for t in task_group if t['is_assignable']]
-                num_assignable = len(assignable_locations)
-
-                if num_assignable > 0:
-                    distributed_weight = base_weight / num_assignable
-                    for task in task_group:
-                        if task in assignable_locations:
-                            task['weight'] = distributed_weight
-                        else:
-                            # Cannot be assigned, so it has 0 chance of being picked
-                            task['weight'] = 0 
-                else:
-                    # No locations for this task can be assigned
-                    for task in task_group:
-                        task['weight'] = 0
-
-                processed_tasks.extend(task_group)
-            
-            tasks = processed_tasks
-            
-        conn.close()
         return tasks
     
     def get_all_tasks(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, name, slayer_requirement
-            FROM tasks
-            ORDER BY name
-        ''')
-        
-        tasks = []
-        for row in cursor.fetchall():
-            tasks.append({
-                'id': row['id'],
-                'name': row['name'],
-                'slayer_requirement': row['slayer_requirement']
-            })
-        
-        conn.close()
-        return tasks
+        return [dict(task) for task in self.get_catalog().tasks]
+
+    def iter_tasks(self, after=None, location=None, wilderness=None, killable=None):
+        # Same keyset scan as iter_monsters, over tasks
+        catalog = self.get_catalog()
+        tasks = catalog.tasks
+        start = 0 if after is None else bisect_right(tasks, after, key=itemgetter('name'))
+        for index in range(start, len(tasks)):
+            task = tasks[index]
+            if _matches_filters(catalog, catalog.monsters_by_task.get(task['id'], ()), location, wilderness, killable):
+                yield dict(task)
 
     def get_all_unlocks(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        # Get all unique quests
-        cursor.execute("SELECT DISTINCT quest_unlocks FROM master_tasks WHERE quest_unlocks IS NOT NULL AND quest_unlocks != '[]'")
-        quests = set()
-        for row in cursor.fetchall():
-            quest_list = json.loads(row['quest_unlocks'])
-            for quest in quest_list:
-                quests.add(quest)
-
-        # Get all unique slayer unlocks
-        cursor.execute("SELECT DISTINCT slayer_unlock FROM master_tasks WHERE slayer_unlock IS NOT NULL")
-        slayer_unlocks = {row['slayer_unlock'] for row in cursor.fetchall()}
-
-        conn.close()
+        unlocks = self.get_catalog().unlocks
         return {
-            'quests': sorted(list(quests)),
-            'slayer_unlocks': sorted(list(slayer_unlocks))
+            'quests': list(unlocks['quests']),
+            'slayer_unlocks': list(unlocks['slayer_unlocks'])
         }
 
-    
     def get_slayer_masters(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM slayer_masters ORDER BY combat_requirement')
         masters = []
-        
-        for row in cursor.fetchall():
+        for master in self.get_catalog().masters:
             masters.append({
-                'id': row['id'],
-                'name': row['name'],
-                'combat_requirement': row['combat_requirement'],
-                'slayer_requirement': row['slayer_requirement'],
-                'points_per_task': row['points_per_task'],
-                'points_per_10th': row['points_per_10th'],
-                'location_based': row['location_based']
+                'id': master['id'],
+                'name': master['name'],
+                'combat_requirement': master['combat_requirement'],
+                'slayer_requirement': master['slayer_requirement'],
+                'points_per_task': master['points_per_task'],
+                'points_per_10th': master['points_per_10th'],
+                'location_based': master['location_based']
             })
         
-        conn.close()
         return masters
     
     def block_task(self, master_id, task_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
-                INSERT INTO blocked_tasks (slayer_master_id, task_id)
-                VALUES (?, ?)
-            ''', (master_id, task_id))
-            conn.commit()
+            with self.transaction() as conn:
+                conn.execute('''
+                    INSERT INTO blocked_tasks (account_id, slayer_master_id, task_id)
+                    VALUES (?, ?, ?)
+                ''', (self.account_id, master_id, task_id))
+                self._note_change('master', self.account_id, master_id)
             return True
         except sqlite3.IntegrityError:
             return False
-        finally:
-            conn.close()
-    
+
     def unblock_task(self, master_id, task_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.transaction() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute('''
-            DELETE FROM blocked_tasks 
-            WHERE slayer_master_id = ? AND task_id = ?
-        ''', (master_id, task_id))
+            cursor.execute('''
+                DELETE FROM blocked_tasks 
+                WHERE account_id = ? AND slayer_master_id = ? AND task_id = ?
+            ''', (self.account_id, master_id, task_id))
+            self._note_change('master', self.account_id, master_id)
         
-        conn.commit()
-        conn.close()
         return True
     
     def get_player_data(self, key):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        data = self.get_player_profile().data
         
-        cursor.execute('SELECT value FROM player_data WHERE key = ?', (key,))
-        row = cursor.fetchone()
-        
-        conn.close()
-        # Handle JSON fields
-        if key in ['completed_quests', 'slayer_unlocks']:
-            return json.loads(row['value']) if row else []
-        return row['value'] if row else None
+        # Handle list fields
+        if key in LIST_KEYS:
+            return list(data.get(key, []))
+        return data.get(key)
 
     def get_all_player_data(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT key, value FROM player_data')
-        data = {}
-        for row in cursor.fetchall():
-            if row['key'] in ['completed_quests', 'slayer_unlocks']:
-                data[row['key']] = json.loads(row['value'])
-            else:
-                data[row['key']] = row['value']
-        conn.close()
-        return data
+        return self.get_player_profile().to_dict()
 
-    def set_player_data(self, key, value):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def get_player_profile(self):
+        # Parsed once and cached until set_player_data commits
+        if getattr(self._local, 'changes', None):
+            return self._load_profile()
+        self.replay_change_log()
 
-        # Handle list fields
-        val_to_store = json.dumps(value) if isinstance(value, list) else str(value)
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO player_data (key, value)
-            VALUES (?, ?)
-        ''', (key, val_to_store))
-        
-        conn.commit()
-        conn.close()
+        account = self._account_state()
+        profile = account.profile
+        if profile is None:
+            profile = self._load_profile(account.profile_version)
+            with self._catalog_lock:
+                # Don't cache a profile a concurrent set_player_data raced past
+                if profile.version == account.profile_version:
+                    account.profile = profile
+        return profile
+
+    def _load_profile(self, version=None):
+        if version is None:
+            version = self.data_version
+        with self.get_connection() as conn:
+            rows = [(row['key'], row['value']) for row in conn.execute(
+                'SELECT key, value FROM player_data WHERE account_id = ?', (self.account_id,))]
+        return PlayerProfile.from_rows(rows, version)
+
+    def set_player_data(self, key, value):
+        # ValueError (nothing written) if value isn't valid for key
+        val_to_store = clean_player_value(key, value)
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO player_data (account_id, key, value)
+                VALUES (?, ?, ?)
+            ''', (self.account_id, key, val_to_store))
+            self._note_change('player', self.account_id)
     
     def calculate_master_efficiency(self, master_id, player_info):
-        tasks = self.get_tasks_for_master(master_id, player_info)
-        
-        # Get master info first, which is needed in all cases
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM slayer_masters WHERE id = ?', (master_id,))
-        master = cursor.fetchone()
-        conn.close()
-
-        # Return a default, zeroed-out structure if master doesn't exist.
-        if not master:
-            return {
-                'total_tasks': 0, 'doable_tasks': 0, 'blocked_tasks': 0, 'skip_rate': 0,
-                'avg_points': 0, 'skip_cost': 0, 'net_points': 0
-            }
-
-        # Filter for tasks that are assignable
-        assignable_tasks = [task for task in tasks if task['is_assignable']]
-
-        # Pre-calculate values
-        doable_tasks_count = sum(1 for task in assignable_tasks if task['can_do'] and not task['is_blocked'])
-        blocked_tasks_count = sum(1 for task in assignable_tasks if task['is_blocked'])
-        avg_points = (9 * master['points_per_task'] + master['points_per_10th']) / 10
-        total_weight = sum(task['weight'] for task in assignable_tasks if not task['is_blocked'])
-        
-        # Handle case with no assignable tasks (all blocked or none exist)
-        if total_weight == 0:
-            return {
-                'total_tasks': len(assignable_tasks),
-                'doable_tasks': doable_tasks_count,
-                'blocked_tasks': blocked_tasks_count,
-                'skip_rate': 100.0 if len(assignable_tasks) > blocked_tasks_count else 0.0,
-                'avg_points': avg_points,
-                'skip_cost': 30.0 if len(assignable_tasks) > blocked_tasks_count and doable_tasks_count == 0 else 0.0,
-                'net_points': avg_points - (30.0 if len(assignable_tasks) > blocked_tasks_count and doable_tasks_count == 0 else 0.0)
-            }
-        
-        # Normal calculation for masters with assignable tasks
-        doable_weight = sum(task['weight'] for task in assignable_tasks 
-                           if not task['is_blocked'] and task['can_do'])
-        
-        skip_rate = 1 - (doable_weight / total_weight)
-        skip_cost = skip_rate * 30
-        
-        efficiency = avg_points - skip_cost
-        
-        return {
-            'total_tasks': len(assignable_tasks),
-            'doable_tasks': doable_tasks_count,
-            'blocked_tasks': blocked_tasks_count,
-            'skip_rate': skip_rate * 100,
-            'avg_points': avg_points,
-            'skip_cost': skip_cost,
-            'net_points': efficiency
-        }
\ No newline at end of file
+        return self.calculate_all_master_efficiencies(player_info, [master_id])[master_id]
+
+    def calculate_all_master_efficiencies(self, player_info, master_ids=None):
+        # master id -> efficiency dict, recomputing only masters whose inputs changed
+        return self._efficiencies(self.get_catalog(), as_profile(player_info), master_ids)
+
+    def _efficiencies(self, catalog, player_info, master_ids):
+        account = self._account_state()
+        if catalog is not account.catalog:
+            # Private snapshot with this thread's uncommitted writes, or one
+            # already replaced by a newer commit: don't cache
+            return calculate_efficiencies(catalog, player_info, master_ids)
+        return account.efficiency_cache.get(catalog, player_info, master_ids)
+
+    def simulate_master(self, master_id, player_info, runs=2000, length=500, start_streak=None, seed=None):
+        # Monte Carlo distributions for one master, or None if it doesn't exist
+        player_info = as_profile(player_info)
+        catalog = self.get_catalog()
+        master = catalog.masters_by_id.get(master_id)
+        if master is None:
+            return None
+
+        if start_streak is None:
+            start_streak = player_info.task_streak if player_info else 0
+        result = {
+            'master_id': master_id,
+            'runs': runs,
+            'assignments_per_run': length,
+            'start_streak': start_streak
+        }
+        model = compile_master_model(catalog, master, player_info)
+        if model is None:
+            result['assignable_tasks'] = 0
+            return result
+
+        result['assignable_tasks'] = len(model['probabilities'])
+        workers = default_workers(runs)
+        if workers == 1:
+            result.update(self._run_cpu(simulate_assignments, model, runs, length, start_streak, seed, 1))
+        else:
+            # Fans out over the simulation's own process pool
+            result.update(simulate_assignments(model, runs, length, start_streak, seed, workers))
+        return result
+
+    def suggest_blocks(self, master_id, player_info, slots=None):
+        # Best tasks to block for one master, or None if it doesn't exist
+        player_info = as_profile(player_info)
+        catalog = self.get_catalog()
+        master = catalog.masters_by_id.get(master_id)
+        if master is None:
+            return None
+        if slots is None:
+            slots = player_info.block_slots if player_info else 0
+        return optimize_blocks(catalog, master, player_info, slots)
+
+    def calculate_what_if(self, profiles):
+        # ([{master id: efficiency}] per profile, number of distinct results),
+        # against this account's kills and blocks but none of its player data
+        return calculate_profile_efficiencies(self.get_catalog(), [as_profile(p) for p in profiles])
+
+    # CPU-bound analysis
+    def use_process_pool(self, executor):
+        # Run single-process simulations on `executor` (None: in the calling
+        # thread). Only the compiled master model crosses over; block
+        # optimisation and what-if batches read the whole snapshot, which
+        # costs more to pickle than to evaluate, so they stay in-thread.
+        self._state.cpu_executor = executor
+
+    def _run_cpu(self, func, *args):
+        executor = self._state.cpu_executor
+        if executor is None:
+            return func(*args)
+        return executor.submit(func, *args).result()
@@ -0,0 +1,473 @@
+import threading
+
+# Task rules and master efficiency maths, evaluated against a CatalogSnapshot
+# and a PlayerProfile (or None to treat every task as assignable).
+# SlayerDatabase uses these both for the per-master task view and for the
+# all-masters efficiency pass, so the two can never disagree.
+
+SKIP_COST = 30
+
+# Search nodes optimize_blocks may visit before settling for the best answer
+# found so far (never worse than its greedy starting point)
+MAX_BLOCK_NODES = 200000
+
+# Streak rewards: every Nth completed task pays this multiple of the master's
+# points_per_10th instead of points_per_task. Checked from the rarest down.
+STREAK_MILESTONES = ((1000, 10), (250, 7), (100, 5), (50, 3), (10, 1))
+
+STREAK_CYCLE = STREAK_MILESTONES[0][0]
+
+def streak_points(master, streak):
+    for every, multiple in STREAK_MILESTONES:
+        if streak % every == 0:
+            return multiple * master['points_per_10th']
+    return master['points_per_task']
+
+def _cycle_counts():
+    # How many of the tasks in one full cycle pay each milestone multiple
+    # (None = a regular task), e.g. 900 regular and 80 10th tasks per 1000
+    counts = {}
+    for streak in range(1, STREAK_CYCLE + 1):
+        multiple = next((m for every, m in STREAK_MILESTONES if streak % every == 0), None)
+        counts[multiple] = counts.get(multiple, 0) + 1
+    return counts
+
+CYCLE_COUNTS = _cycle_counts()
+
+def cycle_points_per_task(master):
+    # Exact average reward per completed task over a whole streak cycle
+    total = sum(count * (master['points_per_task'] if multiple is None else multiple * master['points_per_10th'])
+                for multiple, count in CYCLE_COUNTS.items())
+    return total / STREAK_CYCLE
+
+def is_assignable(row, player_info):
+    if not player_info:
+        return True
+
+    # Check combat and slayer levels
+    if player_info.combat_level < row['combat_requirement']: return False
+    if player_info.slayer_level < row['slayer_requirement']: return False
+
+    # Check quest unlocks (must have all)
+    if not player_info.completed_quests.issuperset(row['quest_unlocks']):
+        return False
+
+    # Check slayer unlock (must have it if specified)
+    if row['slayer_unlock'] and row['slayer_unlock'] not in player_info.slayer_unlocks:
+        return False
+
+    return True
+
+def can_kill_by_count(kill_limit, current_kills, row):
+    # A monster is worth assigning if an average sized task fits in the kills left
+    remaining_kills = -1 if kill_limit == -1 else kill_limit - current_kills
+    return remaining_kills == -1 or remaining_kills >= (row['min_amount'] + row['max_amount']) / 2
+
+def can_kill_by_location(catalog, monster_id, row, is_location_based):
+    restriction = row['location_restriction']
+    if not restriction:
+        return True
+    if restriction == 'Wilderness':
+        # For Krystilia - monster must be in Wilderness
+        return monster_id in catalog.wilderness_monsters
+    if is_location_based:
+        # For Konar - monster must be in the specific location
+        return any(name == restriction for name, _ in catalog.locations_by_monster.get(monster_id, ()))
+    return True
+
+def completion_chance(kill_limit, current_kills, row):
+    # P(a task, its size uniform over min..max, fits in the kills left before
+    # the unlock). kill_limit is the ln(2) median kill count, -1 for no limit.
+    if kill_limit == -1:
+        return 1.0
+    remaining = kill_limit - current_kills
+    low, high = row['min_amount'], max(row['min_amount'], row['max_amount'])
+    if remaining >= high:
+        return 1.0
+    if remaining < low:
+        return 0.0
+    return (remaining - low + 1) / (high - low + 1)
+
+def task_doability(catalog, row, is_location_based):
+    # (can_do, doable_chance). The task size is drawn once and any eligible
+    # monster will do, so the chance is that of the monster with most kills left.
+    can_do = False
+    chance = 0.0
+    for monster_id in catalog.monsters_by_task.get(row['id'], ()):
+        monster = catalog.monsters_by_id.get(monster_id)
+        if monster is None or not can_kill_by_location(catalog, monster_id, row, is_location_based):
+            continue
+        current_kills = catalog.kills.get(monster_id, 0)
+        if can_kill_by_count(monster['kill_limit'], current_kills, row):
+            can_do = True
+        chance = max(chance, completion_chance(monster['kill_limit'], current_kills, row))
+        if chance == 1.0 and can_do:
+            break
+    return can_do, chance
+
+def effective_weights(rows, assignable, is_location_based):
+    # Konar splits a task's weight evenly over the locations the player can be
+    # sent to; everyone else uses the row weight as is.
+    if not is_location_based:
+        return [row['weight'] for row in rows]
+
+    num_assignable = {}
+    for row, ok in zip(rows, assignable):
+        num_assignable[row['name']] = num_assignable.get(row['name'], 0) + (1 if ok else 0)
+
+    # Cannot be assigned, so it has 0 chance of being picked
+    return [row['weight'] / num_assignable[row['name']] if ok else 0
+            for row, ok in zip(rows, assignable)]
+
+def master_assignments(catalog, master, player_info):
+    # (row, weight, doable_chance) for every row the master can actually hand
+    # out to this player: assignable, not blocked and with a non-zero weight
+    is_location_based = master['location_based']
+    rows = catalog.master_tasks.get(master['id'], ())
+    blocked_task_ids = catalog.blocked.get(master['id'], frozenset())
+    assignable = [is_assignable(row, player_info) for row in rows]
+    weights = effective_weights(rows, assignable, is_location_based)
+    return [(row, weight, task_doability(catalog, row, is_location_based)[1])
+            for row, ok, weight in zip(rows, assignable, weights)
+            if ok and weight > 0 and row['id'] not in blocked_task_ids]
+
+def summarize_efficiency(master, tasks):
+    # Return a default, zeroed-out structure if master doesn't exist.
+    if not master:
+        return {
+            'total_tasks': 0, 'doable_tasks': 0, 'blocked_tasks': 0, 'skip_rate': 0,
+            'avg_points': 0, 'skip_cost': 0, 'net_points': 0
+        }
+
+    # Filter for tasks that are assignable
+    assignable_tasks = [task for task in tasks if task['is_assignable']]
+
+    # Pre-calculate values
+    doable_tasks_count = sum(1 for task in assignable_tasks if task['can_do'] and not task['is_blocked'])
+    blocked_tasks_count = sum(1 for task in assignable_tasks if task['is_blocked'])
+    # The exact streak cycle average, as in expected_points, so the page ranks
+    # masters by the same net points per assignment the model reports
+    avg_points = cycle_points_per_task(master)
+    total_weight = sum(task['weight'] for task in assignable_tasks if not task['is_blocked'])
+
+    # Handle case with no assignable tasks (all blocked or none exist)
+    if total_weight == 0:
+        return {
+            'total_tasks': len(assignable_tasks),
+            'doable_tasks': doable_tasks_count,
+            'blocked_tasks': blocked_tasks_count,
+            'skip_rate': 100.0 if len(assignable_tasks) > blocked_tasks_count else 0.0,
+            'avg_points': avg_points,
+            'skip_cost': float(SKIP_COST) if len(assignable_tasks) > blocked_tasks_count and doable_tasks_count == 0 else 0.0,
+            'net_points': -(float(SKIP_COST) if len(assignable_tasks) > blocked_tasks_count and doable_tasks_count == 0 else 0.0)
+        }
+
+    # Normal calculation for masters with assignable tasks
+    # Weighted by the chance each task can be finished, not just can_do
+    doable_weight = sum(task['weight'] * task['doable_chance'] for task in assignable_tasks
+                        if not task['is_blocked'])
+
+    skip_rate = 1 - (doable_weight / total_weight)
+    skip_cost = skip_rate * SKIP_COST
+
+    # Only the doable share of assignments pays out
+    efficiency = (1 - skip_rate) * avg_points - skip_cost
+
+    return {
+        'total_tasks': len(assignable_tasks),
+        'doable_tasks': doable_tasks_count,
+        'blocked_tasks': blocked_tasks_count,
+        'skip_rate': skip_rate * 100,
+        'avg_points': avg_points,
+        'skip_cost': skip_cost,
+        'net_points': efficiency
+    }
+
+def expected_points(master, tasks):
+    # Renewal model of the assignment loop: each assignment is doable with
+    # probability q (doable share of the assignable, unblocked weight) and
+    # completes the next task of the streak, otherwise it is skipped for
+    # SKIP_COST and the streak is untouched. So a completed task takes 1/q
+    # assignments and pays the cycle average, with no approximation needed.
+    if not master:
+        return {'doable_chance': 0.0, 'points_per_task': 0.0, 'skips_per_task': None,
+                'net_points_per_task': None, 'net_points_per_assignment': 0.0}
+
+    points_per_task = cycle_points_per_task(master)
+    total_weight = sum(task['weight'] for task in tasks if task['is_assignable'] and not task['is_blocked'])
+    doable_weight = sum(task['weight'] * task['doable_chance'] for task in tasks
+                        if task['is_assignable'] and not task['is_blocked'])
+    if total_weight == 0:
+        return {'doable_chance': 0.0, 'points_per_task': points_per_task, 'skips_per_task': None,
+                'net_points_per_task': None, 'net_points_per_assignment': 0.0}
+
+    q = doable_weight / total_weight
+    skips_per_task = (1 - q) / q if q > 0 else None
+    return {
+        'doable_chance': q,
+        'points_per_task': points_per_task,
+        'skips_per_task': skips_per_task,
+        'net_points_per_task': points_per_task - skips_per_task * SKIP_COST if q > 0 else None,
+        'net_points_per_assignment': q * points_per_task - (1 - q) * SKIP_COST
+    }
+
+def _net_points_per_assignment(points_per_task, q):
+    return q * points_per_task - (1 - q) * SKIP_COST
+
+def optimize_blocks(catalog, master, player_info, slots):
+    # Best set of at most `slots` tasks to block for this master. Net points
+    # per assignment is (points + SKIP_COST) * q - SKIP_COST, so this comes down
+    # to maximising q, the doable share of the unblocked weight. Current
+    # blocks are ignored: the answer may swap some of them out.
+    is_location_based = master['location_based']
+    rows = catalog.master_tasks.get(master['id'], ())
+    assignable = [is_assignable(row, player_info) for row in rows]
+    weights = effective_weights(rows, assignable, is_location_based)
+
+    # Blocks are per task, so Konar's location rows are summed per task id
+    totals = {}     # task id -> [weight, doable weight]
+    for row, ok, weight in zip(rows, assignable, weights):
+        if not ok or weight <= 0:
+            continue
+        entry = totals.setdefault(row['id'], [0.0, 0.0])
+        entry[0] += weight
+        entry[1] += weight * task_doability(catalog, row, is_location_based)[1]
+    total_weight = sum(weight for weight, _ in totals.values())
+    doable_weight = sum(doable for _, doable in totals.values())
+
+    # Only tasks with some undoable weight can raise q; most undoable first,
+    # so the next k candidates are always the k best left (used by the bound)
+    candidates = sorted(((weight - doable, weight, doable, task_id)
+                         for task_id, (weight, doable) in totals.items() if weight > doable),
+                        key=lambda c: (-c[0], c[3]))
+
+    def share(doable, total):
+        return doable / total if total > 0 else 0.0
+
+    # Greedy pass for a good starting incumbent
+    chosen = []
+    doable, total = doable_weight, total_weight
+    remaining = list(candidates)
+    while len(chosen) < slots and remaining:
+        pick = max(remaining, key=lambda c: share(doable - c[2], total - c[1]) if total > c[1] else -1)
+        if total <= pick[1] or share(doable - pick[2], total - pick[1]) <= share(doable, total):
+            break
+        remaining.remove(pick)
+        chosen.append(pick[3])
+        doable, total = doable - pick[2], total - pick[1]
+    best = [share(doable, total), tuple(chosen)]
+
+    # Identical (weight, doable) candidates are interchangeable, so each group
+    # of them is one item taken 0..n times instead of n! orderings. Groups
+    # stay in candidate order: most undoable first, least doable among ties.
+    groups = {}
+    for undoable, weight, task_doable, task_id in candidates:
+        groups.setdefault((undoable, weight, task_doable), []).append(task_id)
+    groups = sorted(((key[0], key[1], key[2], tuple(ids)) for key, ids in groups.items()),
+                    key=lambda g: (-g[0], g[2]))
+
+    # A task with no more doable and no less undoable weight than another is
+    # always at least as good to block, so once a group is passed over (or
+    # not taken in full) a later one at least as doable can't be in a better
+    # answer. Only safe while some unblockable weight keeps totals positive.
+    prune_dominated = total_weight - sum(c[1] for c in candidates) > 0
+    nodes = 0
+    exhaustive = True
+
+    # Branch and bound over the groups, carrying the running sums down so
+    # every node is evaluated in O(1) plus the bound
+    def search(start, chosen, doable, total, slots_left, passed_doable):
+        nonlocal nodes, exhaustive
+        if nodes >= MAX_BLOCK_NODES:
+            exhaustive = False
+            return
+        nodes += 1
+        q = share(doable, total)
+        if q > best[0] + 1e-12:
+            best[0], best[1] = q, chosen
+        if slots_left == 0 or start >= len(groups):
+            return
+        # Upper bound: blocking weight w with doable part d never beats
+        # removing only its undoable part w - d from the denominator
+        gain, left = 0.0, slots_left
+        for undoable, _, _, task_ids in groups[start:]:
+            take = min(left, len(task_ids))
+            gain += take * undoable
+            left -= take
+            if not left:
+                break
+        bound = 1.0 if total - gain <= 0 else doable / (total - gain)
+        if bound <= best[0] + 1e-12:
+            return
+        for i in range(start, len(groups)):
+            _, weight, task_doable, task_ids = groups[i]
+            if prune_dominated and task_doable >= passed_doable:
+                continue
+            for take in range(min(slots_left, len(task_ids)), 0, -1):
+                if total - take * weight <= 0:
+                    continue
+                search(i + 1, chosen + task_ids[:take], doable - take * task_doable, total - take * weight,
+                       slots_left - take, passed_doable if take == len(task_ids) else min(passed_doable, task_doable))
+            passed_doable = min(passed_doable, task_doable)
+
+    if slots > 0:
+        search(0, (), doable_weight, total_weight, slots, float('inf'))
+
+    points_per_task = cycle_points_per_task(master)
+    current = sorted(catalog.blocked.get(master['id'], frozenset()) & totals.keys())
+    current_doable = doable_weight - sum(totals[task_id][1] for task_id in current)
+    current_total = total_weight - sum(totals[task_id][0] for task_id in current)
+    recommended = sorted(best[1])
+
+    def describe(task_ids, q):
+        return {
+            'blocked': [{'id': task_id, 'name': catalog.tasks_by_id[task_id]['name']} for task_id in task_ids],
+            'doable_chance': q,
+            'net_points_per_assignment': _net_points_per_assignment(points_per_task, q)
+        }
+
+    return {
+        'master_id': master['id'],
+        'block_slots': slots,
+        'current': describe(current, share(current_doable, current_total)),
+        'recommended': describe(recommended, best[0]),
+        'to_block': [task_id for task_id in recommended if task_id not in current],
+        'to_unblock': [task_id for task_id in current if task_id not in best[1]],
+        'nodes': nodes,
+        # False if the node budget ran out and this is only the best found
+        'exhaustive': exhaustive
+    }
+
+def _master_efficiency(catalog, master, assignable, doability_cache):
+    # Doability only depends on the task, its size range and its location
+    # rule, so doability_cache shares it between masters (and profiles)
+    is_location_based = master['location_based']
+    rows = catalog.master_tasks.get(master['id'], ())
+    blocked_task_ids = catalog.blocked.get(master['id'], frozenset())
+    weights = effective_weights(rows, assignable, is_location_based)
+
+    tasks = []
+    for row, ok, weight in zip(rows, assignable, weights):
+        key = (row['id'], row['min_amount'], row['max_amount'], row['location_restriction'], bool(is_location_based))
+        doability = doability_cache.get(key)
+        if doability is None:
+            doability = doability_cache[key] = task_doability(catalog, row, is_location_based)
+        can_do, doable_chance = doability
+        tasks.append({
+            'weight': weight,
+            'is_assignable': ok,
+            'is_blocked': row['id'] in blocked_task_ids,
+            'can_do': can_do,
+            'doable_chance': doable_chance
+        })
+
+    result = summarize_efficiency(master, tasks)
+    result['expected'] = expected_points(master, tasks)
+    return result
+
+def calculate_efficiencies(catalog, player_info, master_ids=None):
+    # One pass over every master's task rows
+    doability_cache = {}
+    results = {}
+    for master in catalog.masters:
+        master_id = master['id']
+        if master_ids is not None and master_id not in master_ids:
+            continue
+        assignable = [is_assignable(row, player_info) for row in catalog.master_tasks.get(master_id, ())]
+        results[master_id] = _master_efficiency(catalog, master, assignable, doability_cache)
+
+    if master_ids is not None:
+        for master_id in master_ids:
+            if master_id not in results:
+                results[master_id] = summarize_efficiency(None, [])
+                results[master_id]['expected'] = expected_points(None, [])
+    return results
+
+def calculate_profile_efficiencies(catalog, profiles):
+    # What-if efficiencies for many profiles at once: ([{master id: result}]
+    # per profile, number of distinct profiles). The requirements of every row
+    # are compiled into distinct groups so each profile checks each group
+    # once, and doability is shared by all profiles. A master's result only
+    # depends on which of its own groups are met, so profiles that agree on
+    # those share it and most extra profiles cost a few tuple lookups.
+    groups = {}
+    master_groups = {}  # master id -> (distinct groups it uses, position of each row's group in that)
+    for master in catalog.masters:
+        used = {}
+        positions = []
+        for row in catalog.master_tasks.get(master['id'], ()):
+            requirement = (row['combat_requirement'], row['slayer_requirement'],
+                           row['quest_unlocks'], row['slayer_unlock'])
+            if requirement not in groups:
+                groups[requirement] = len(groups)
+            positions.append(used.setdefault(groups[requirement], len(used)))
+        master_groups[master['id']] = (tuple(used), positions)
+    requirements = [dict(combat_requirement=combat, slayer_requirement=slayer,
+                         quest_unlocks=quests, slayer_unlock=unlock)
+                    for combat, slayer, quests, unlock in groups]
+
+    doability_cache = {}
+    cache = {}          # (master id, groups met) -> result
+    signatures = set()
+    results = []
+    for player_info in profiles:
+        met = [is_assignable(requirement, player_info) for requirement in requirements]
+        signatures.add(tuple(met))
+        efficiencies = {}
+        for master in catalog.masters:
+            used, positions = master_groups[master['id']]
+            key = (master['id'], tuple(met[group] for group in used))
+            result = cache.get(key)
+            if result is None:
+                result = cache[key] = _master_efficiency(
+                    catalog, master, [key[1][position] for position in positions], doability_cache)
+            efficiencies[master['id']] = result
+        results.append(efficiencies)
+    return results, len(signatures)
+
+def profile_key(player_info):
+    return player_info.key if player_info else None
+
+class EfficiencyCache:
+    # Per-master efficiency results for the current catalog snapshot and player
+    # profile. Catalog writes only evict the masters they can affect, found
+    # through CatalogSnapshot.masters_by_monster, so most reads do no work.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._profile_key = None
+        self._results = {}
+
+    def invalidate(self, catalog, changes, version):
+        with self._lock:
+            self._version = version
+            if catalog is None or ('full',) in changes:
+                self._results = {}
+                return
+            for kind, key in changes:
+                if kind == 'monster':
+                    for master_id in catalog.masters_by_monster.get(key, ()):
+                        self._results.pop(master_id, None)
+                elif kind == 'master':
+                    self._results.pop(key, None)
+
+    def get(self, catalog, player_info, master_ids=None):
+        key = profile_key(player_info)
+        with self._lock:
+            if self._version != catalog.version or self._profile_key != key:
+                self._version = catalog.version
+                self._profile_key = key
+                self._results = {}
+            wanted = [m['id'] for m in catalog.masters] if master_ids is None else list(master_ids)
+            results = {master_id: self._results.get(master_id) for master_id in wanted}
+
+        missing = [master_id for master_id, result in results.items() if result is None]
+        if missing:
+            computed = calculate_efficiencies(catalog, player_info, missing)
+            results.update(computed)
+            with self._lock:
+                # Don't store results an invalidation raced past
+                if self._version == catalog.version and self._profile_key == key:
+                    self._results.update(computed)
+
+        return {master_id: dict(result, expected=dict(result['expected'])) for master_id, result in results.items()}
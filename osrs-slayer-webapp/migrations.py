@@ -0,0 +1,318 @@
+# Numbered schema migrations. PRAGMA user_version records how many have been
+# applied, so a database that is already current is opened without any DDL.
+
+def migration_1_base_schema(cursor):
+    # Databases created before user_version was tracked start at 0 too, so every
+    # step here has to be safe on top of any earlier layout.
+
+    # Create tables
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS monsters (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            kill_limit INTEGER NOT NULL,
+            added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS kills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            monster_id INTEGER,
+            kills INTEGER DEFAULT 0,
+            FOREIGN KEY (monster_id) REFERENCES monsters (id),
+            UNIQUE(monster_id)
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS slayer_masters (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            combat_requirement INTEGER DEFAULT 0,
+            slayer_requirement INTEGER DEFAULT 0,
+            points_per_task INTEGER DEFAULT 0,
+            points_per_10th INTEGER DEFAULT 0,
+            location_based INTEGER DEFAULT 0
+        )
+    ''')
+    
+    # Add location_based column if it doesn't exist
+    cursor.execute("PRAGMA table_info(slayer_masters)")
+    columns = [row[1] for row in cursor.fetchall()]
+    if 'location_based' not in columns:
+        cursor.execute("ALTER TABLE slayer_masters ADD COLUMN location_based INTEGER DEFAULT 0")
+    
+    # Locations table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS locations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            is_wilderness INTEGER DEFAULT 0
+        )
+    ''')
+    
+    # Which monsters are found in which locations
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS monster_locations (
+            monster_id INTEGER,
+            location_id INTEGER,
+            FOREIGN KEY (monster_id) REFERENCES monsters (id),
+            FOREIGN KEY (location_id) REFERENCES locations (id),
+            PRIMARY KEY (monster_id, location_id)
+        )
+    ''')
+    
+    # Global tasks table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            slayer_requirement INTEGER DEFAULT 1
+        )
+    ''')
+
+    # Check and correct master_tasks schema
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='master_tasks'")
+    table_sql_row = cursor.fetchone()
+    if table_sql_row and "UNIQUE(slayer_master_id, task_id, location_restriction)" not in table_sql_row['sql']:
+        cursor.execute("DROP TABLE master_tasks")
+
+    # Which masters can assign which tasks
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS master_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            slayer_master_id INTEGER,
+            task_id INTEGER,
+            weight INTEGER DEFAULT 1,
+            min_amount INTEGER DEFAULT 10,
+            max_amount INTEGER DEFAULT 50,
+            quest_unlocks TEXT,
+            slayer_unlock TEXT,
+            location_restriction TEXT,
+            FOREIGN KEY (slayer_master_id) REFERENCES slayer_masters (id),
+            FOREIGN KEY (task_id) REFERENCES tasks (id),
+            UNIQUE(slayer_master_id, task_id, location_restriction)
+        )
+    ''')
+    
+    # Add location_restriction column if it doesn't exist (for fresh dbs)
+    cursor.execute("PRAGMA table_info(master_tasks)")
+    columns = [row[1] for row in cursor.fetchall()]
+    if 'location_restriction' not in columns:
+        cursor.execute("ALTER TABLE master_tasks ADD COLUMN location_restriction TEXT")
+    
+    # Which monsters belong to which tasks
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_monsters (
+            task_id INTEGER,
+            monster_id INTEGER,
+            FOREIGN KEY (task_id) REFERENCES tasks (id),
+            FOREIGN KEY (monster_id) REFERENCES monsters (id),
+            PRIMARY KEY (task_id, monster_id)
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS player_data (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS blocked_tasks (
+            slayer_master_id INTEGER,
+            task_id INTEGER,
+            FOREIGN KEY (slayer_master_id) REFERENCES slayer_masters (id),
+            FOREIGN KEY (task_id) REFERENCES tasks (id),
+            PRIMARY KEY (slayer_master_id, task_id)
+        )
+    ''')
+    
+    # Initialize slayer masters if they don't exist
+    masters = [
+        ('Turael', 0, 1, 0, 0, 0),
+        ('Mazchna', 20, 1, 2, 5, 0),
+        ('Vannaka', 40, 1, 4, 20, 0),
+        ('Chaeldar', 70, 1, 10, 50, 0),
+        ('Nieve', 85, 1, 12, 60, 0),
+        ('Duradel', 100, 50, 15, 75, 0),
+        ('Krystilia', 0, 1, 25, 125, 0),
+        ('Spria', 0, 1, 0, 0, 0),
+        ('Konar', 75, 1, 18, 90, 1)
+    ]
+    
+    for master in masters:
+        cursor.execute('''
+            INSERT OR IGNORE INTO slayer_masters 
+            (name, combat_requirement, slayer_requirement, points_per_task, points_per_10th, location_based)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', master)
+    
+    # Initialize player data with defaults
+    player_defaults = {
+        'slayer_points': '0',
+        'task_streak': '0',
+        'combat_level': '3',
+        'slayer_level': '1',
+        'completed_quests': '[]',
+        'slayer_unlocks': '[]',
+        'block_slots': '0'
+    }
+    for key, value in player_defaults.items():
+        cursor.execute('INSERT OR IGNORE INTO player_data (key, value) VALUES (?, ?)', (key, value))
+
+def migration_2_seed_tracking(cursor):
+    # Digest of the seed file last applied, plus one digest per seed row so a
+    # changed file only touches the rows that actually changed
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS seed_rows (
+            kind TEXT,
+            key TEXT,
+            digest TEXT,
+            PRIMARY KEY (kind, key)
+        )
+    ''')
+
+def migration_3_kill_events(cursor):
+    # Append-only history behind the kills aggregate
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS kill_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            monster_id INTEGER NOT NULL,
+            kills INTEGER NOT NULL,
+            source TEXT,
+            recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (monster_id) REFERENCES monsters (id)
+        )
+    ''')
+
+def migration_4_accounts(cursor):
+    # Kills, blocks, player data and the kill log belong to an account; the
+    # catalog stays shared. Everything that existed before becomes account 1.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO accounts (id, name) VALUES (1, 'default')")
+
+    # SQLite can't change a primary key in place, so rebuild the tables
+    cursor.execute('ALTER TABLE player_data RENAME TO player_data_old')
+    cursor.execute('''
+        CREATE TABLE player_data (
+            account_id INTEGER NOT NULL DEFAULT 1,
+            key TEXT,
+            value TEXT,
+            FOREIGN KEY (account_id) REFERENCES accounts (id),
+            PRIMARY KEY (account_id, key)
+        )
+    ''')
+    cursor.execute('INSERT INTO player_data (account_id, key, value) SELECT 1, key, value FROM player_data_old')
+    cursor.execute('DROP TABLE player_data_old')
+
+    cursor.execute('ALTER TABLE kills RENAME TO kills_old')
+    cursor.execute('''
+        CREATE TABLE kills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_id INTEGER NOT NULL DEFAULT 1,
+            monster_id INTEGER,
+            kills INTEGER DEFAULT 0,
+            FOREIGN KEY (account_id) REFERENCES accounts (id),
+            FOREIGN KEY (monster_id) REFERENCES monsters (id),
+            UNIQUE(account_id, monster_id)
+        )
+    ''')
+    cursor.execute('INSERT INTO kills (account_id, monster_id, kills) SELECT 1, monster_id, kills FROM kills_old')
+    cursor.execute('DROP TABLE kills_old')
+
+    cursor.execute('ALTER TABLE blocked_tasks RENAME TO blocked_tasks_old')
+    cursor.execute('''
+        CREATE TABLE blocked_tasks (
+            account_id INTEGER NOT NULL DEFAULT 1,
+            slayer_master_id INTEGER,
+            task_id INTEGER,
+            FOREIGN KEY (account_id) REFERENCES accounts (id),
+            FOREIGN KEY (slayer_master_id) REFERENCES slayer_masters (id),
+            FOREIGN KEY (task_id) REFERENCES tasks (id),
+            PRIMARY KEY (account_id, slayer_master_id, task_id)
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO blocked_tasks (account_id, slayer_master_id, task_id)
+        SELECT 1, slayer_master_id, task_id FROM blocked_tasks_old
+    ''')
+    cursor.execute('DROP TABLE blocked_tasks_old')
+
+    cursor.execute('ALTER TABLE kill_events ADD COLUMN account_id INTEGER NOT NULL DEFAULT 1 REFERENCES accounts (id)')
+
+def migration_5_change_log(cursor):
+    # Change sets of recent write transactions, so processes sharing the file
+    # can patch their snapshots (see database.ChangeLog)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY,
+            origin INTEGER NOT NULL,
+            changes TEXT NOT NULL
+        )
+    ''')
+
+MIGRATIONS = [
+    migration_1_base_schema,
+    migration_2_seed_tracking,
+    migration_3_kill_events,
+    migration_4_accounts,
+    migration_5_change_log,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(conn):
+    # Must run inside a write transaction; returns True if anything was applied
+    current = schema_version(conn)
+    if current >= SCHEMA_VERSION:
+        return False
+
+    cursor = conn.cursor()
+    for migration in MIGRATIONS[current:]:
+        migration(cursor)
+    cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return True
+
+# Statements the request and write paths run one row (or one account) at a
+# time, as written in database.py and catalog.py; none of them may fall back
+# to a full table scan (see SlayerDatabase.full_table_scans). Whole-table
+# snapshot and ingestion loads are left out, they read everything anyway.
+HOT_QUERIES = [
+    # Snapshot patches and account loads
+    'SELECT id, name, kill_limit FROM monsters WHERE id = ?',
+    'SELECT kills FROM kills WHERE account_id = ? AND monster_id = ?',
+    'SELECT task_id FROM blocked_tasks WHERE account_id = ? AND slayer_master_id = ?',
+    'SELECT monster_id, kills FROM kills WHERE account_id = ?',
+    'SELECT slayer_master_id, task_id FROM blocked_tasks WHERE account_id = ?',
+    'SELECT key, value FROM player_data WHERE account_id = ?',
+    'SELECT value FROM catalog_meta WHERE key = ?',
+    'SELECT id FROM accounts WHERE name = ?',
+    # Writes
+    'INSERT INTO kills (account_id, monster_id, kills) VALUES (?, ?, ?) '
+    'ON CONFLICT (account_id, monster_id) DO UPDATE SET kills = kills + excluded.kills',
+    'UPDATE monsters SET kill_limit = ? WHERE id = ?',
+    'DELETE FROM blocked_tasks WHERE account_id = ? AND slayer_master_id = ? AND task_id = ?',
+    'SELECT id FROM locations WHERE name = ?',
+    # Cross-process replay
+    'SELECT seq, origin, changes FROM change_log WHERE seq > ? ORDER BY seq',
+    'SELECT COALESCE(MAX(seq), 0) FROM change_log',
+    'DELETE FROM change_log WHERE seq <= ?',
+]
@@ -0,0 +1,93 @@
+import json
+
+LIST_KEYS = ('completed_quests', 'slayer_unlocks')
+
+# What a new account starts with, stored the way player_data stores values
+PLAYER_DEFAULTS = {
+    'slayer_points': '0',
+    'task_streak': '0',
+    'combat_level': '3',
+    'slayer_level': '1',
+    'completed_quests': '[]',
+    'slayer_unlocks': '[]',
+    'block_slots': '0'
+}
+
+# Whole-number settings and what a missing or unreadable one counts as
+INT_DEFAULTS = {'combat_level': 3, 'slayer_level': 1, 'slayer_points': 0, 'task_streak': 0, 'block_slots': 0}
+
+def _as_int(value):
+    # A non-negative int, or a string holding one
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(value)
+    number = int(value)
+    if number < 0:
+        raise ValueError(value)
+    return number
+
+def clean_player_value(key, value):
+    # The text set_player_data stores for key; ValueError if value isn't valid
+    # for it, so a bad save is refused instead of breaking every later read
+    if key in INT_DEFAULTS:
+        return str(_as_int(value))
+    if key in LIST_KEYS:
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ValueError(value)
+        return json.dumps(value)
+    return json.dumps(value) if isinstance(value, list) else str(value)
+
+def _int_setting(data, key):
+    try:
+        return _as_int(data.get(key, INT_DEFAULTS[key]))
+    except ValueError:
+        return INT_DEFAULTS[key]
+
+def _list_setting(data, key):
+    value = data.get(key, ())
+    if not isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset()
+    return frozenset(item for item in value if isinstance(item, str))
+
+class PlayerProfile:
+    # Typed, immutable view of the player_data table. Built once per change by
+    # SlayerDatabase.get_player_profile, so the hot path never parses JSON or
+    # casts levels, and quest/unlock checks are set lookups.
+    __slots__ = ('version', 'combat_level', 'slayer_level', 'completed_quests', 'slayer_unlocks',
+                 'slayer_points', 'task_streak', 'block_slots', 'key', 'data')
+
+    def __init__(self, data, version=0):
+        self.version = version
+        self.data = data    # raw key -> value, as /api/player-data returns it
+        # Values stored before they were validated fall back to the defaults
+        self.combat_level = _int_setting(data, 'combat_level')
+        self.slayer_level = _int_setting(data, 'slayer_level')
+        self.completed_quests = _list_setting(data, 'completed_quests')
+        self.slayer_unlocks = _list_setting(data, 'slayer_unlocks')
+        self.slayer_points = _int_setting(data, 'slayer_points')
+        self.task_streak = _int_setting(data, 'task_streak')
+        self.block_slots = _int_setting(data, 'block_slots')
+        # Hashable identity for caches keyed on what the efficiency maths reads
+        self.key = (self.combat_level, self.slayer_level, self.completed_quests, self.slayer_unlocks)
+
+    @classmethod
+    def from_rows(cls, rows, version=0):
+        data = {}
+        for key, value in rows:
+            if key in LIST_KEYS:
+                try:
+                    value = json.loads(value)
+                except (TypeError, ValueError):
+                    value = []
+                if not isinstance(value, list):
+                    value = []
+            data[key] = value
+        return cls(data, version)
+
+    def to_dict(self):
+        return {key: list(value) if key in LIST_KEYS else value for key, value in self.data.items()}
+
+def as_profile(player_info):
+    # Accept the plain dicts callers used to pass around
+    if player_info is None or isinstance(player_info, PlayerProfile):
+        return player_info
+    return PlayerProfile(player_info)
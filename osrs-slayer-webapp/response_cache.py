@@ -0,0 +1,34 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+class ResponseCache:
+    # Serialized bodies of read endpoints. Each entry belongs to one request
+    # path (with its query string) and remembers the versions it was rendered at; a request with other
+    # versions re-renders and replaces it. The ETag is a hash of the bytes, so
+    # it stays valid across restarts even though the versions start over.
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # path -> (versions, body, etag)
+        self._lock = threading.Lock()
+
+    def get(self, path, versions, render):
+        # (body, etag); render() returns the body bytes on a miss
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(path)
+                return entry[1], entry[2]
+
+        body = render()
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        with self._lock:
+            self._entries[path] = (versions, body, etag)
+            self._entries.move_to_end(path)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body, etag
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import math
+import os
+
+# The built-in game data: one JSON record per line after a header line, so it
+# can be read a line at a time and only when seeding actually needs it.
+SEED_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'seed_catalog.jsonl')
+SEED_FORMAT = 'osrs-slayer-seed'
+SEED_VERSION = 1
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def iter_seed_records(path):
+    with open(path, encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('format') != SEED_FORMAT or header.get('version') != SEED_VERSION:
+            raise ValueError(f"Unsupported seed catalog header: {header}")
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def _row_digest(record):
+    return hashlib.sha256(json.dumps(record, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _record_key(record):
+    if record['kind'] == 'assignment':
+        return f"{record['master']}|{record['task']}|{record['location_restriction'] or ''}"
+    return record['name']
+
+def _kill_limit(drop_rate):
+    # Apply the ln(2) calculation for monsters with a drop rate
+    return math.ceil(drop_rate * math.log(2)) if drop_rate != -1 else -1
+
+def load_seed_catalog(db, path=SEED_CATALOG_PATH):
+    # Returns (changed, counts). An unchanged file is a no-op; otherwise rows
+    # the seed has never applied are inserted without touching existing data,
+    # and rows whose seed entry changed since last time are updated.
+    digest = file_digest(path)
+    if db.get_catalog_meta('seed_digest') == digest:
+        return False, None
+
+    applied = db.get_seed_digests()
+    row_digests = {}
+    batches = {False: ([], [], []), True: ([], [], [])}   # replace? -> (tasks, monsters, assignments)
+
+    for record in iter_seed_records(path):
+        kind = record['kind']
+        key = (kind, _record_key(record))
+        row_digest = row_digests[key] = _row_digest(record)
+        if applied.get(key) == row_digest:
+            continue
+
+        tasks, monsters, assignments = batches[key in applied]
+        if kind == 'task':
+            tasks.append((record['name'], record['slayer_requirement']))
+        elif kind == 'monster':
+            monsters.append((record['name'], _kill_limit(record['drop_rate']), record['tasks'], record['locations']))
+        elif kind == 'assignment':
+            assignments.append((record['master'], record['task'], record['weight'],
+                                record['min_amount'], record['max_amount'], record['quest_unlocks'],
+                                record['slayer_unlock'], record['location_restriction']))
+
+    with db.transaction():
+        counts = db.ingest_catalog(*batches[False])
+        updated = db.ingest_catalog(*batches[True], replace=True)
+        for kind, kind_counts in updated.items():
+            for outcome, count in kind_counts.items():
+                counts[kind][outcome] += count
+        db.record_seed(digest, row_digests)
+
+    return True, counts
@@ -0,0 +1,101 @@
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
+from werkzeug.serving import make_server
+
+# Production launcher: pre-forked workers sharing one listening socket.
+#     python serve.py --workers 4 --port 5000
+# The parent imports the app once (so the schema check and migrations run
+# once), warms the catalog, profile and efficiency caches, then forks; the
+# workers start with those snapshots already in memory. Writes made in one
+# worker reach the others through the change_log table.
+
+RESTART_DELAY = 1.0     # seconds before replacing a worker that died
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run the slayer tracker with pre-forked workers')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--busy-timeout', type=int, default=10000,
+                        help='ms a worker waits for another one holding the write lock')
+    return parser.parse_args()
+
+def warm_up(db):
+    db.enable_change_log()
+    db.get_catalog()
+    db.calculate_all_master_efficiencies(db.get_player_profile())
+
+def run_worker(app, db, listener):
+    # In the child: serve until told to stop, then flush and leave without
+    # running the parent's cleanup
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    status = 0
+    try:
+        if os.environ.get('SLAYER_WRITE_BEHIND'):
+            db.enable_write_behind(
+                max_pending=int(os.environ.get('SLAYER_WRITE_BEHIND_MAX', 1000)),
+                max_delay=float(os.environ.get('SLAYER_WRITE_BEHIND_DELAY', 1.0)))
+        host, port = listener.getsockname()[:2]
+        server = make_server(host, port, app, threaded=True, fd=listener.fileno())
+        server.serve_forever()
+    except SystemExit:
+        pass
+    except BaseException:
+        status = 1
+    finally:
+        try:
+            db.close()
+        finally:
+            os._exit(status)
+
+def spawn(app, db, listener):
+    pid = os.fork()
+    if pid == 0:
+        run_worker(app, db, listener)
+    return pid
+
+def main():
+    args = parse_args()
+    import app as web
+
+    db = web.db
+    db.pool.busy_timeout_ms = args.busy_timeout
+    warm_up(db)
+    db.prepare_fork()
+
+    listener = socket.create_server((args.host, args.port), backlog=1024)
+    listener.set_inheritable(True)
+    workers = {spawn(web.app, db, listener) for _ in range(max(1, args.workers))}
+    print(f'Serving on http://{args.host}:{args.port} with {len(workers)} workers', flush=True)
+
+    stopping = False
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        workers.discard(pid)
+        if not stopping:
+            time.sleep(RESTART_DELAY)
+            workers.add(spawn(web.app, db, listener))
+    listener.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    # Only the simulator needs NumPy; the rest of the app runs without it
+    np = None
+
+from efficiency import SKIP_COST, STREAK_MILESTONES, master_assignments
+
+# Monte Carlo simulation of a master's task assignments. Each run is one
+# player taking `length` assignments in a row: tasks are drawn from the real
+# effective weights (blocks and unassignable tasks removed), each is completed
+# with its doable chance, a task size drawn from min..max and a payout on the
+# streak schedule, anything else is skipped for SKIP_COST points.
+
+MAX_DRAWS = 20000000        # runs * length accepted per simulation
+CHUNK_RUNS = 256            # runs per NumPy batch, keeps the arrays a few MB
+MIN_RUNS_PER_WORKER = 500   # below this a worker process costs more than it saves
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def simulation_available():
+    return np is not None
+
+def compile_master_model(catalog, master, player_info):
+    # Plain arrays (picklable, so they can go to worker processes), or None if
+    # the master has nothing it could assign
+    assignments = master_assignments(catalog, master, player_info)
+    if not assignments:
+        return None
+    rows, weights, doable_chance = zip(*assignments)
+    weights = np.array(weights, dtype=np.float64)
+    return {
+        'points_per_task': master['points_per_task'],
+        'points_per_10th': master['points_per_10th'],
+        'probabilities': weights / weights.sum(),
+        'doable_chance': np.array(doable_chance, dtype=np.float64),
+        'min_amount': np.array([row['min_amount'] for row in rows], dtype=np.int64),
+        'max_amount': np.array([row['max_amount'] for row in rows], dtype=np.int64),
+    }
+
+def _streak_points(model, streak):
+    points = np.full(streak.shape, float(model['points_per_task']))
+    # Smallest milestone first so the rarer ones overwrite it
+    for every, multiple in reversed(STREAK_MILESTONES):
+        points[streak % every == 0] = multiple * model['points_per_10th']
+    return points
+
+def _simulate_chunk(model, batches, length, start_streak):
+    # One row per run: (points earned, tasks completed, kills). Each batch is
+    # (runs, seed), with its own generator so where it runs doesn't matter
+    results = []
+    for batch, seed in batches:
+        rng = np.random.default_rng(seed)
+        draws = rng.choice(len(model['probabilities']), size=(batch, length), p=model['probabilities'])
+        completed = rng.random(draws.shape) < model['doable_chance'][draws]
+        streak = start_streak + np.cumsum(completed, axis=1)
+        earned = np.where(completed, _streak_points(model, streak), 0.0).sum(axis=1)
+        sizes = rng.integers(model['min_amount'][draws], model['max_amount'][draws] + 1)
+        kills = np.where(completed, sizes, 0).sum(axis=1)
+        results.append(np.column_stack([earned, completed.sum(axis=1), kills]))
+    return np.concatenate(results)
+
+def get_process_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the web server has threads and open SQLite handles
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+def _distribution(values):
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    mean = float(values.mean())
+    std = float(values.std())
+    half_width = 1.96 * std / math.sqrt(len(values))
+    p5, p50, p95 = (float(v) for v in np.percentile(values, [5, 50, 95]))
+    return {
+        'mean': mean,
+        'std': std,
+        'ci95': [mean - half_width, mean + half_width],
+        'p5': p5,
+        'median': p50,
+        'p95': p95
+    }
+
+def default_workers(runs):
+    return max(1, min(os.cpu_count() or 1, runs // MIN_RUNS_PER_WORKER))
+
+def simulate_assignments(model, runs=2000, length=500, start_streak=0, seed=None, workers=None):
+    # Runs are seeded in fixed batches of CHUNK_RUNS, so a given seed gives
+    # the same results whatever the worker count
+    if workers is None:
+        workers = default_workers(runs)
+    sizes = [min(CHUNK_RUNS, runs - offset) for offset in range(0, runs, CHUNK_RUNS)]
+    batches = list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+    workers = max(1, min(workers, len(batches)))
+
+    if workers == 1:
+        totals = _simulate_chunk(model, batches, length, start_streak)
+    else:
+        # Consecutive batches per worker, so the runs come back in order
+        bounds = [len(batches) * i // workers for i in range(workers + 1)]
+        pool = get_process_pool()
+        futures = [pool.submit(_simulate_chunk, model, batches[start:end], length, start_streak)
+                   for start, end in zip(bounds, bounds[1:])]
+        totals = np.concatenate([future.result() for future in futures])
+
+    earned, tasks, kills = totals[:, 0], totals[:, 1], totals[:, 2]
+    skips = length - tasks
+    net = earned - skips * SKIP_COST
+    with np.errstate(divide='ignore', invalid='ignore'):
+        points_per_task = np.where(tasks > 0, earned / tasks, np.nan)
+        kills_per_point = np.where(net > 0, kills / net, np.nan)
+
+    return {
+        'points_per_task': _distribution(points_per_task),
+        'net_points_per_assignment': _distribution(net / length),
+        'skip_rate': _distribution(skips / length * 100),
+        'kills_per_point': _distribution(kills_per_point)
+    }
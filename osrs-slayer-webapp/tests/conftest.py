@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SlayerDatabase
+from seed import load_seed_catalog
+
+@pytest.fixture
+def db(tmp_path):
+    # A fresh database holding the built-in seed catalog
+    database = SlayerDatabase(str(tmp_path / 'slayer_tracker.db'))
+    load_seed_catalog(database)
+    yield database
+    database.close()
+
+@pytest.fixture
+def client(db, tmp_path_factory, monkeypatch):
+    # app.py opens ./slayer_tracker.db when first imported, so import it away
+    # from the working tree, then point its routes at the test database
+    monkeypatch.chdir(tmp_path_factory.getbasetemp())
+    import app as web
+    monkeypatch.setattr(web, 'db', db)
+    web.response_cache.clear()
+    return web.app.test_client()
+
+class ChangeCollector:
+    # Subscriber that keeps every change set published, one entry per commit
+    def __init__(self):
+        self.published = []
+
+    def put(self, changes):
+        self.published.append(set(changes))
@@ -0,0 +1,153 @@
+import pytest
+
+from conftest import ChangeCollector
+
+def _limited_monster(db):
+    return next(m for m in db.get_catalog().monsters if m['kill_limit'] != -1)
+
+def test_kill_events_accept_sources_and_timestamps(client, db):
+    monster = _limited_monster(db)
+    response = client.post('/api/kill-events', json={'events': [
+        {'monster_id': monster['id'], 'kills': 2, 'source': 'plugin', 'timestamp': 1700000000},
+        {'monster_id': monster['id'], 'kills': 1, 'timestamp': '2024-01-02T03:04:05+01:00'},
+        {'monster_id': monster['id'], 'kills': 1},
+    ]})
+    assert response.status_code == 200
+    assert db.get_catalog().kills[monster['id']] == 4
+    with db.get_connection() as conn:
+        recorded = [tuple(row) for row in conn.execute(
+            'SELECT source, recorded_at FROM kill_events WHERE monster_id = ? ORDER BY id', (monster['id'],))]
+    assert recorded[:2] == [('plugin', '2023-11-14 22:13:20'), ('api', '2024-01-02 02:04:05')]
+
+@pytest.mark.parametrize('extra', [
+    {'source': 5},
+    {'source': ['a']},
+    {'source': 'x' * 1000},
+    {'timestamp': 'yesterday'},
+    {'timestamp': True},
+    {'timestamp': {'at': 1}},
+    {'timestamp': 1e300},
+])
+def test_kill_events_reject_bad_sources_and_timestamps(client, db, extra):
+    monster = _limited_monster(db)
+    response = client.post('/api/kill-events', json={'events': [
+        {'monster_id': monster['id'], 'kills': 1},
+        dict({'monster_id': monster['id'], 'kills': 1}, **extra),
+    ]})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid event at index 1'
+    assert monster['id'] not in db.get_catalog().kills or db.get_catalog().kills[monster['id']] == 0
+
+def test_kill_events_reject_unhashable_monster_ids(client):
+    response = client.post('/api/kill-events', json={'events': [{'monster_id': [1], 'kills': 1}]})
+    assert response.status_code == 400
+
+def test_player_data_rejects_bad_levels(client, db):
+    response = client.post('/api/player-data', json={'slayer_level': '70', 'combat_level': ''})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid value for combat_level'
+    assert db.get_player_profile().slayer_level == 1    # nothing from the request was saved
+
+    response = client.post('/api/player-data', json={'completed_quests': 'Dragon Slayer I'})
+    assert response.status_code == 400
+
+    assert client.post('/api/player-data', json={'slayer_level': '70', 'combat_level': 90}).status_code == 200
+    profile = db.get_player_profile()
+    assert (profile.combat_level, profile.slayer_level) == (90, 70)
+
+def test_bad_stored_player_data_still_reads(client, db):
+    with db.transaction() as conn:
+        conn.execute("UPDATE player_data SET value = 'abc' WHERE key IN ('combat_level', 'completed_quests')")
+        db._note_change('player', db.account_id)
+
+    response = client.get('/api/player-data')
+    assert response.status_code == 200
+    assert response.get_json()['combat_level'] == 'abc'
+    assert response.get_json()['completed_quests'] == []
+    assert client.get('/api/slayer-masters').status_code == 200
+
+    # ...and can be fixed from the page
+    assert client.post('/api/player-data', json={'combat_level': 50}).status_code == 200
+    assert db.get_player_profile().combat_level == 50
+
+def test_what_if_rejects_bad_profiles(client):
+    response = client.post('/api/what-if', json={'profiles': [{'combat_level': 90}, {'slayer_level': 'high'}]})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid profile at index 1'
+
+@pytest.mark.parametrize('key', ['slayer_points', 'task_streak', 'block_slots'])
+def test_cleared_counters_are_refused(client, db, key):
+    # What the page posts when one of these inputs is emptied
+    assert client.post('/api/player-data', json={key: ''}).status_code == 400
+    assert client.post('/api/player-data', json={key: '-3'}).status_code == 400
+    assert client.get('/api/player-data').status_code == 200
+    assert client.get('/api/slayer-masters').status_code == 200
+
+    with db.transaction() as conn:
+        conn.execute("UPDATE player_data SET value = '' WHERE key = ?", (key,))
+        db._note_change('player', db.account_id)
+    assert getattr(db.get_player_profile(), key) == 0
+    master_id = db.get_slayer_masters()[0]['id']
+    for path in ('/api/player-data', '/api/slayer-masters', f'/api/slayer-masters/{master_id}/tasks'):
+        assert client.get(path).status_code == 200
+
+def test_saving_the_player_form_commits_once(client, db):
+    collector = ChangeCollector()
+    with db.subscribe_changes(collector):
+        response = client.post('/api/player-data', json={
+            'combat_level': 100, 'slayer_level': 90, 'block_slots': 5,
+            'completed_quests': ['Dragon Slayer I'], 'slayer_unlocks': []})
+    assert response.status_code == 200
+    assert collector.published == [{('player', db.account_id)}]
+
+def test_kill_effects_report_the_new_state(client, db):
+    catalog = db.get_catalog()
+    monster = next(m for m in catalog.monsters
+                   if m['kill_limit'] != -1 and catalog.masters_by_monster.get(m['id']))
+    response = client.post(f'/api/monsters/{monster["id"]}/kills?effects=true',
+                           json={'kills': monster['kill_limit']})
+    assert response.status_code == 200
+    effects = response.get_json()['effects']
+    assert effects['monster']['current_kills'] == monster['kill_limit']
+    assert effects['monster']['remaining'] == 0
+    assert set(map(int, effects['efficiencies'])) == set(catalog.masters_by_monster[monster['id']])
+
+def test_unchanged_reads_answer_304(client):
+    first = client.get('/api/slayer-masters')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and etag
+
+    again = client.get('/api/slayer-masters', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.get_data() == b''
+    assert again.headers['ETag'] == etag
+
+@pytest.mark.parametrize('path, write', [('/api/monsters', 'kill'), ('/api/slayer-masters', 'player')])
+def test_writes_change_the_etag(client, db, path, write):
+    before = client.get(path)
+    etag = before.headers['ETag']
+    if write == 'kill':
+        monster_id = db.get_catalog().monsters[0]['id']
+        assert client.post(f'/api/monsters/{monster_id}/kills', json={'kills': 5}).status_code == 200
+    else:
+        assert client.post('/api/player-data', json={'slayer_level': 99}).status_code == 200
+
+    after = client.get(path, headers={'If-None-Match': etag})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != etag
+    assert after.get_json() != before.get_json()
+
+def test_killable_tasks_follow_the_account(client, db):
+    # Kill out a task's only monster on one account but not the other
+    catalog = db.get_catalog()
+    task_id, (monster_id,) = next((task_id, monsters) for task_id, monsters in catalog.monsters_by_task.items()
+                                  if len(monsters) == 1 and catalog.monsters_by_id[monsters[0]]['kill_limit'] != -1)
+    assert client.post('/api/accounts', json={'name': 'alt'}).status_code == 200
+    alt_db = db.account(db.get_account_id('alt'))
+    alt_db.record_kills(monster_id, catalog.monsters_by_id[monster_id]['kill_limit'])
+
+    def killable_task_ids(path):
+        return {task['id'] for task in client.get(f'{path}?killable=true').get_json()['items']}
+    assert task_id in killable_task_ids('/api/all-tasks')
+    assert task_id not in killable_task_ids('/api/accounts/alt/all-tasks')
+    assert client.get('/api/accounts/nobody/all-tasks').status_code == 404
@@ -0,0 +1,35 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _record_kills_elsewhere(db_name, monster_id):
+    # Another worker process writing to the same database file
+    subprocess.run([sys.executable, '-c', (
+        'import sys; from database import SlayerDatabase; '
+        'db = SlayerDatabase(sys.argv[1]); db.enable_change_log(); '
+        'db.record_kills(int(sys.argv[2]), 1); db.close()'), db_name, str(monster_id)],
+        cwd=APP_DIR, check=True)
+
+def test_event_streams_replay_other_workers_commits(client, db, monkeypatch):
+    # Commits from another process only reach this one through change_log
+    import asgi
+    monkeypatch.setattr(asgi, 'db', db)
+    db.enable_change_log()
+    monster_id = db.get_catalog().monsters[0]['id']
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        hub = asgi.EventHub(loop)
+        stream = asgi.StreamQueue()
+        hub.add(stream)
+        try:
+            await loop.run_in_executor(None, _record_kills_elsewhere, db.db_name, monster_id)
+            return await asyncio.wait_for(stream.get(), 5)
+        finally:
+            hub.discard(stream)
+            hub.close()
+
+    assert ('kills', db.account_id, monster_id) in asyncio.run(main())
@@ -0,0 +1,50 @@
+import math
+
+from seed import SEED_CATALOG_PATH, load_seed_catalog
+
+def test_replace_only_counts_rows_that_change(db):
+    kill_limit = math.ceil(64 * math.log(2))
+    hands = ('Crawling Hand', kill_limit, ['Crawling Hands'], ['Slayer Tower', 'Catacombs of Kourend'])
+    counts = db.ingest_catalog(
+        tasks=[('Crawling Hands', 5), ('Bats', 2)],
+        monsters=[hands,
+                  ('Cave Crawler', 1, ['Cave crawlers'], ['Fremennik Slayer Dungeon']),
+                  ('Nobody', 10, ['No such task'], [])],
+        assignments=[('No such master', 'Bats', 1, 1, 1, [], None, None)],
+        replace=True)
+
+    assert counts['tasks'] == {'inserted': 0, 'updated': 1, 'skipped': 1, 'conflicts': 0, 'unlinked': 0}
+    assert counts['monsters'] == {'inserted': 0, 'updated': 1, 'skipped': 1, 'conflicts': 0, 'unlinked': 1}
+    assert counts['assignments']['unlinked'] == 1
+    assert counts['assignments']['skipped'] == 0
+
+    # A missing link is a change too
+    counts = db.ingest_catalog(monsters=[hands[:3] + (['Stronghold Slayer Cave'],)], replace=True)
+    assert counts['monsters']['updated'] == 1
+    counts = db.ingest_catalog(monsters=[hands[:3] + (['Stronghold Slayer Cave'],)], replace=True)
+    assert counts['monsters']['skipped'] == 1
+
+def _monster(db, name):
+    return next(m for m in db.get_catalog().monsters if m['name'] == name)
+
+def test_reseeding_only_updates_changed_rows(db, tmp_path):
+    # A user edit to a row the seed did not change must survive a reseed
+    crawler = _monster(db, 'Cave Crawler')
+    db.update_monster_drop_rate(crawler['id'], 7)
+
+    path = tmp_path / 'seed_catalog.jsonl'
+    with open(SEED_CATALOG_PATH, encoding='utf-8') as f:
+        path.write_text(f.read().replace('"name": "Crawling Hand", "drop_rate": 64',
+                                         '"name": "Crawling Hand", "drop_rate": 100'), encoding='utf-8')
+
+    changed, counts = load_seed_catalog(db, str(path))
+    assert changed
+    assert counts['monsters']['updated'] == 1
+    assert sum(kind['inserted'] + kind['updated'] for kind in counts.values()) == 1
+    assert _monster(db, 'Crawling Hand')['kill_limit'] == math.ceil(100 * math.log(2))
+    assert _monster(db, 'Cave Crawler')['kill_limit'] == 7
+
+def test_loading_the_same_seed_again_is_a_no_op(db):
+    version = db.data_version
+    assert load_seed_catalog(db) == (False, None)
+    assert db.data_version == version
@@ -0,0 +1,120 @@
+import itertools
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import efficiency
+from efficiency import completion_chance, expected_points, optimize_blocks, summarize_efficiency
+
+def _task(weight, doable_chance, is_blocked=False):
+    return {'weight': weight, 'is_assignable': True, 'is_blocked': is_blocked,
+            'can_do': doable_chance > 0, 'doable_chance': doable_chance}
+
+def test_net_points_come_from_the_exact_model():
+    # Per 1000 tasks: 900 regular, 80 10th, 8 50th, 8 100th, 3 250th and one 1000th
+    master = {'points_per_task': 15, 'points_per_10th': 75}
+    tasks = [_task(3, 1.0), _task(1, 0.0), _task(5, 0.0, is_blocked=True)]
+    summary = summarize_efficiency(master, tasks)
+    assert summary['avg_points'] == pytest.approx((900 * 15 + 80 * 75 + 8 * 225 + 8 * 375 + 3 * 525 + 750) / 1000)
+    assert summary['skip_rate'] == pytest.approx(25.0)
+    assert summary['net_points'] == pytest.approx(0.75 * 26.625 - 0.25 * 30)
+    assert summary['net_points'] == pytest.approx(expected_points(master, tasks)['net_points_per_assignment'])
+
+def _block_catalog(tasks, doable_weight=0):
+    # A one-master catalog. tasks: (weight, doable chance in tenths); each
+    # task's one monster has exactly that chance of fitting a 1..10 task
+    rows, monsters_by_task, monsters_by_id, kills = [], {}, {}, {}
+    for task_id, (weight, tenths) in enumerate(tasks, 1):
+        rows.append({'id': task_id, 'name': f'Task {task_id}', 'weight': weight,
+                     'min_amount': 1, 'max_amount': 10, 'location_restriction': None})
+        monsters_by_task[task_id] = (task_id,)
+        monsters_by_id[task_id] = {'id': task_id, 'kill_limit': 100}
+        kills[task_id] = 100 - tenths
+    if doable_weight:
+        # Plus a task that can always be done, so some weight can't be blocked
+        task_id = len(tasks) + 1
+        rows.append({'id': task_id, 'name': 'Always', 'weight': doable_weight,
+                     'min_amount': 1, 'max_amount': 10, 'location_restriction': None})
+        monsters_by_task[task_id] = (task_id,)
+        monsters_by_id[task_id] = {'id': task_id, 'kill_limit': -1}
+    catalog = SimpleNamespace(
+        master_tasks={1: rows}, monsters_by_task=monsters_by_task, monsters_by_id=monsters_by_id,
+        kills=kills, wilderness_monsters=frozenset(), locations_by_monster={}, blocked={},
+        tasks_by_id={row['id']: row for row in rows})
+    master = {'id': 1, 'location_based': 0, 'points_per_task': 10, 'points_per_10th': 50}
+    return catalog, master
+
+def _best_share(tasks, doable_weight, slots):
+    # Brute force over every set of at most `slots` tasks
+    best = 0.0
+    for size in range(slots + 1):
+        for chosen in itertools.combinations(range(len(tasks)), size):
+            kept = [task for i, task in enumerate(tasks) if i not in chosen]
+            total = doable_weight + sum(weight for weight, _ in kept)
+            if total > 0:
+                best = max(best, (doable_weight + sum(weight * tenths / 10 for weight, tenths in kept)) / total)
+    return best
+
+@pytest.mark.parametrize('seed', range(40))
+def test_block_optimizer_matches_brute_force(seed):
+    # Few distinct weights and chances, so most cases have ties
+    rng = random.Random(seed)
+    tasks = [(rng.choice([1, 2, 3, 5]), rng.choice([0, 0, 3, 5, 8, 10])) for _ in range(rng.randint(1, 9))]
+    doable_weight = rng.choice([0, 0, 4])
+    slots = rng.randint(0, 5)
+    catalog, master = _block_catalog(tasks, doable_weight)
+    result = optimize_blocks(catalog, master, None, slots)
+    assert result['exhaustive']
+    assert len(result['recommended']['blocked']) <= slots
+    assert result['recommended']['doable_chance'] == pytest.approx(_best_share(tasks, doable_weight, slots))
+
+def test_block_optimizer_handles_many_tied_tasks():
+    # 40 tasks in four tied groups and 20 slots: without grouping ties this is
+    # millions of equivalent orderings
+    tasks = [(2, 0)] * 10 + [(1, 0)] * 10 + [(2, 5)] * 10 + [(3, 2)] * 10
+    catalog, master = _block_catalog(tasks, doable_weight=10)
+    result = optimize_blocks(catalog, master, None, 20)
+    assert result['exhaustive']
+    assert result['nodes'] < 10000
+
+    best = 0.0
+    for counts in itertools.product(range(11), repeat=4):
+        if sum(counts) <= 20:
+            kept = [(weight, tenths, 10 - count) for (weight, tenths), count in zip(tasks[::10], counts)]
+            total = 10 + sum(weight * n for weight, _, n in kept)
+            best = max(best, (10 + sum(weight * tenths / 10 * n for weight, tenths, n in kept)) / total)
+    assert result['recommended']['doable_chance'] == pytest.approx(best)
+
+def test_block_optimizer_stops_at_the_node_budget(monkeypatch):
+    rng = random.Random(0)
+    tasks = [(rng.uniform(1, 50), rng.randint(0, 9)) for _ in range(40)]
+    catalog, master = _block_catalog(tasks, doable_weight=20)
+    exact = optimize_blocks(catalog, master, None, 10)
+    assert exact['exhaustive']
+
+    # A budget of one node is the greedy answer; more can only improve on it
+    shares = []
+    for budget in (1, 20):
+        monkeypatch.setattr(efficiency, 'MAX_BLOCK_NODES', budget)
+        result = optimize_blocks(catalog, master, None, 10)
+        assert not result['exhaustive']
+        assert result['nodes'] == budget
+        assert len(result['recommended']['blocked']) <= 10
+        shares.append(result['recommended']['doable_chance'])
+    assert shares[0] <= shares[1] <= exact['recommended']['doable_chance']
+
+@pytest.mark.parametrize('kill_limit, current_kills, low, high, chance', [
+    (-1, 500, 10, 20, 1.0),     # no limit
+    (100, 100, 1, 5, 0.0),      # at the limit
+    (100, 150, 1, 5, 0.0),      # past it
+    (100, 90, 11, 20, 0.0),     # every size is too big
+    (100, 70, 11, 20, 1.0),     # every size fits
+    (100, 80, 20, 20, 1.0),     # one size, just fits
+    (100, 81, 20, 20, 0.0),     # one size, one kill short
+    (100, 85, 11, 20, 0.5),     # 11..15 of 11..20 fit
+    (100, 85, 20, 11, 0.0),     # max below min counts as min
+])
+def test_completion_chance(kill_limit, current_kills, low, high, chance):
+    row = {'min_amount': low, 'max_amount': high}
+    assert completion_chance(kill_limit, current_kills, row) == chance
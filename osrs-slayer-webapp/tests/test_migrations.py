@@ -0,0 +1,30 @@
+import os
+
+from migrations import HOT_QUERIES, SCHEMA_VERSION, schema_version
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _source():
+    # database.py and catalog.py with all whitespace collapsed, so multi-line
+    # SQL reads as one line
+    text = ''
+    for name in ('database.py', 'catalog.py'):
+        with open(os.path.join(APP_DIR, name)) as f:
+            text += ' '.join(f.read().split()) + '\n'
+    return text
+
+def test_hot_queries_are_statements_the_code_runs():
+    source = _source()
+    missing = [sql for sql in HOT_QUERIES if ' '.join(sql.split()) not in source]
+    assert missing == []
+
+def test_hot_queries_never_scan_a_whole_table(db):
+    assert db.full_table_scans() == []
+
+def test_migrations_bring_a_database_up_to_date(db):
+    with db.get_connection() as conn:
+        assert schema_version(conn) == SCHEMA_VERSION
+        indexes = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    # Catalog tables are only ever read whole and the kill log is never
+    # read by key, so the primary keys and UNIQUE constraints are enough
+    assert all(name.startswith('sqlite_autoindex_') for name in indexes)
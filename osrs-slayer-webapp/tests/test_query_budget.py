@@ -0,0 +1,37 @@
+from catalog import CATALOG_QUERY_BUDGET, ACCOUNT_QUERY_BUDGET
+
+def test_cold_catalog_load_takes_the_budgeted_queries(db):
+    db.add_task('Budget check', 1)     # drops every snapshot
+    with db.count_queries() as statements:
+        db.get_catalog()
+    assert len(statements) == CATALOG_QUERY_BUDGET + ACCOUNT_QUERY_BUDGET
+
+def test_account_snapshot_reuses_the_shared_catalog(db):
+    db.get_catalog()
+    _, account_id = db.create_account('alt')
+    with db.count_queries() as statements:
+        db.account(account_id).get_catalog()
+    assert len(statements) == ACCOUNT_QUERY_BUDGET
+
+def test_listing_queries_do_not_grow_with_the_catalog(db):
+    db.add_task('Budget check', 1)
+    with db.count_queries() as before:
+        db.get_all_monsters()
+    for i in range(20):
+        db.add_monster(f'Budget monster {i}', 100, [], ['Budget location'])
+    with db.count_queries() as after:
+        db.get_all_monsters()
+    assert len(after) == len(before) == CATALOG_QUERY_BUDGET + ACCOUNT_QUERY_BUDGET
+
+def test_warm_reads_run_no_queries(db):
+    player_info = db.get_player_profile()
+    masters = db.get_slayer_masters()
+    db.calculate_all_master_efficiencies(player_info)
+    with db.count_queries() as statements:
+        db.get_catalog()
+        db.get_all_monsters()
+        db.get_all_tasks()
+        db.get_slayer_masters()
+        db.get_tasks_for_master(masters[0]['id'], db.get_player_profile())
+        db.calculate_all_master_efficiencies(db.get_player_profile())
+    assert statements == []
@@ -0,0 +1,31 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from simulation import compile_master_model, simulate_assignments
+
+def _konar_model(db):
+    catalog = db.get_catalog()
+    master = next(m for m in catalog.masters if m['name'] == 'Konar')
+    return master, compile_master_model(catalog, master, None)
+
+def test_a_seed_gives_the_same_results(db):
+    _, model = _konar_model(db)
+    first = simulate_assignments(model, runs=300, length=200, seed=42, workers=1)
+    assert simulate_assignments(model, runs=300, length=200, seed=42, workers=1) == first
+    assert simulate_assignments(model, runs=300, length=200, seed=43, workers=1) != first
+
+def test_simulated_means_match_the_exact_model(db):
+    # Long runs cover a few streak cycles, so the partial last cycle is a
+    # small bias on top of the sampling error
+    master, model = _konar_model(db)
+    expected = db.calculate_all_master_efficiencies(None, [master['id']])[master['id']]['expected']
+    result = simulate_assignments(model, runs=256, length=4000, seed=1, workers=1)
+    assert result['points_per_task']['mean'] == pytest.approx(expected['points_per_task'], rel=0.02)
+    assert result['net_points_per_assignment']['mean'] == pytest.approx(expected['net_points_per_assignment'], rel=0.02)
+    assert result['skip_rate']['mean'] == pytest.approx((1 - expected['doable_chance']) * 100, abs=0.5)
+
+def test_process_pool_matches_a_single_process(db):
+    _, model = _konar_model(db)
+    single = simulate_assignments(model, runs=600, length=100, seed=5, workers=1)
+    assert simulate_assignments(model, runs=600, length=100, seed=5, workers=2) == single
@@ -0,0 +1,153 @@
+import sqlite3
+import threading
+
+import pytest
+
+from conftest import ChangeCollector
+from database import SlayerDatabase
+
+def test_failed_write_keeps_the_snapshots(db):
+    catalog = db.get_catalog()
+    player_info = db.get_player_profile()
+    version = db.data_version
+
+    ok, _ = db.create_account('default')
+    assert not ok
+    assert db.data_version == version
+    assert db.get_catalog() is catalog
+    assert db.get_player_profile() is player_info
+
+def test_committed_write_replaces_the_snapshot(db):
+    catalog = db.get_catalog()
+    monster = next(m for m in catalog.monsters if m['kill_limit'] != -1)
+    db.record_kills(monster['id'], 3)
+    assert db.get_catalog() is not catalog
+    assert db.get_catalog().kills[monster['id']] == catalog.kills.get(monster['id'], 0) + 3
+
+def test_only_committed_writes_reach_subscribers(db):
+    master_id = db.get_slayer_masters()[0]['id']
+    task_id = db.get_catalog().master_tasks[master_id][0]['id']
+    collector = ChangeCollector()
+    with db.subscribe_changes(collector):
+        assert db.block_task(master_id, task_id)
+        assert not db.block_task(master_id, task_id)     # duplicate, rolled back
+    assert collector.published == [{('master', db.account_id, master_id)}]
+
+def test_accounts_created_elsewhere_are_found(db):
+    # Another process (here a second handle on the same file) creates the account
+    assert db.get_account_id('default') == 1
+    other = SlayerDatabase(db.db_name)
+    try:
+        _, account_id = other.create_account('alt')
+    finally:
+        other.close()
+    assert db.get_account_id('alt') == account_id
+    assert db.get_account_id('nobody') is None
+
+def _stored_kills(db, monster_id):
+    with db.get_connection() as conn:
+        row = conn.execute('SELECT kills FROM kills WHERE account_id = ? AND monster_id = ?',
+                           (db.account_id, monster_id)).fetchone()
+    return row['kills'] if row else 0
+
+def test_buffered_kills_are_read_before_the_flush(db, client):
+    monster_id = db.get_catalog().monsters[0]['id']
+    db.enable_write_behind(max_delay=60)
+    db.record_kills(monster_id, 4)
+
+    assert _stored_kills(db, monster_id) == 0
+    assert db.get_catalog().kills[monster_id] == 4
+    monsters = client.get('/api/monsters').get_json()
+    assert next(m for m in monsters if m['id'] == monster_id)['current_kills'] == 4
+
+    # A snapshot rebuilt from the database still counts them
+    db.add_task('Rebuild', 1)
+    assert db.get_catalog().kills[monster_id] == 4
+
+def test_close_flushes_buffered_kills(db, monkeypatch):
+    import database
+    exit_handlers = []
+    monkeypatch.setattr(database.atexit, 'register', exit_handlers.append)
+    monkeypatch.setattr(database.atexit, 'unregister', lambda handler: None)
+    monster_id = db.get_catalog().monsters[0]['id']
+    db.enable_write_behind(max_delay=60)
+    db.record_kills(monster_id, 2)
+
+    assert exit_handlers == [db.close]
+    exit_handlers[0]()
+    other = SlayerDatabase(db.db_name)
+    assert _stored_kills(other, monster_id) == 2
+    other.close()
+
+def test_failed_flush_keeps_the_kills(db, monkeypatch):
+    monster_id = db.get_catalog().monsters[0]['id']
+    db.enable_write_behind(max_delay=60)
+    db.record_kills(monster_id, 3)
+
+    def busy(self, events):
+        raise sqlite3.OperationalError('database is locked')
+    with monkeypatch.context() as patch:
+        patch.setattr(SlayerDatabase, 'record_kill_events', busy)
+        with pytest.raises(sqlite3.OperationalError):
+            db.flush_kills()
+
+    assert _stored_kills(db, monster_id) == 0
+    assert db.get_catalog().kills[monster_id] == 3
+    db.record_kills(monster_id, 1)
+    assert db.flush_kills() == 1
+    assert _stored_kills(db, monster_id) == 4
+    assert db.get_catalog().kills[monster_id] == 4
+
+def test_change_events_only_cover_what_changed(db):
+    catalog = db.get_catalog()
+    monster = next(m for m in catalog.monsters
+                   if 0 < len(catalog.masters_by_monster.get(m['id'], ())) < len(catalog.masters))
+    master_id = catalog.masters[0]['id']
+    task_id = catalog.master_tasks[master_id][0]['id']
+    _, other_id = db.create_account('other')
+
+    collector = ChangeCollector()
+    with db.subscribe_changes(collector):
+        db.record_kills(monster['id'], 2)
+        db.block_task(master_id, task_id)
+        db.block_task(master_id, task_id)               # duplicate, rolled back
+        db.account(other_id).record_kills(monster['id'], 2)
+    kill, block, other_kill = collector.published
+
+    events = db.change_events(kill)
+    assert [event for event, _ in events] == ['monster', 'efficiency']
+    assert events[0][1]['id'] == monster['id'] and events[0][1]['current_kills'] == 2
+    assert set(events[1][1]) == set(catalog.masters_by_monster[monster['id']])
+
+    events = db.change_events(block)
+    assert events[0] == ('blocked', {'master_id': master_id, 'task_ids': [task_id]})
+    assert [event for event, _ in events] == ['blocked', 'efficiency']
+    assert set(events[1][1]) == {master_id}
+
+    assert db.change_events(other_kill) == []
+
+def test_effects_ignore_commits_from_other_threads(db):
+    db.set_player_data('combat_level', 126)
+    db.set_player_data('slayer_level', 99)
+    catalog = db.get_catalog()
+    monster_id = next(monsters[0] for task_id, monsters in catalog.monsters_by_task.items()
+                      if len(monsters) == 1 and catalog.monsters_by_id[monsters[0]]['kill_limit'] != -1
+                      and catalog.masters_by_monster.get(monsters[0]))
+    master_ids = sorted(catalog.masters_by_monster[monster_id])
+    kill_limit = catalog.monsters_by_id[monster_id]['kill_limit']
+    seen = {}
+
+    def write():
+        db.record_kills(monster_id, 1)
+        seen['efficiencies'] = db.calculate_all_master_efficiencies(db.get_player_profile(), master_ids)
+        # Another request kills the monster out before the effects are read
+        other = threading.Thread(target=db.record_kills, args=(monster_id, kill_limit))
+        other.start()
+        other.join()
+        return True
+
+    _, effects = db.run_with_effects(write, monster_id=monster_id)
+    assert effects['monster']['current_kills'] == 1
+    assert effects['doability'] == []
+    assert effects['efficiencies'] == seen['efficiencies']
+    assert db.get_catalog().kills[monster_id] == kill_limit + 1
@@ -0,0 +1,86 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+class KillBuffer:
+    # Coalesces kill increments per (account, monster, source) in memory and hands them
+    # to `flush` from a background thread once max_pending increments have
+    # piled up or max_delay seconds have passed since the first one.
+    def __init__(self, flush, max_pending=1000, max_delay=1.0):
+        self._flush = flush
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._pending = {}          # (account_id, monster_id, source) -> [kills, first recorded_at]
+        self._count = 0
+        self._first_added = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='kill-write-behind', daemon=True)
+        self._thread.start()
+
+    def add(self, account_id, monster_id, kills, source):
+        with self._lock:
+            key = (account_id, monster_id, source)
+            entry = self._pending.get(key)
+            if entry is None:
+                # Same format as SQLite's CURRENT_TIMESTAMP
+                recorded_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                self._pending[key] = [kills, recorded_at]
+            else:
+                entry[0] += kills
+            self._count += 1
+            if self._first_added is None:
+                self._first_added = time.monotonic()
+                self._wake.notify()
+            elif self._count >= self.max_pending:
+                self._wake.notify()
+
+    def totals(self, account_id):
+        # monster id -> kills not yet written for one account
+        with self._lock:
+            totals = {}
+            for (pending_account, monster_id, _), (kills, _) in self._pending.items():
+                if pending_account == account_id:
+                    totals[monster_id] = totals.get(monster_id, 0) + kills
+            return totals
+
+    def take(self):
+        with self._lock:
+            events = [(account_id, monster_id, kills, source, recorded_at)
+                      for (account_id, monster_id, source), (kills, recorded_at) in self._pending.items()]
+            self._pending = {}
+            self._count = 0
+            self._first_added = None
+            return events
+
+    def restore(self, events):
+        # Put back events whose flush failed so they're retried, not lost
+        for account_id, monster_id, kills, source, _ in events:
+            self.add(account_id, monster_id, kills, source)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._first_added is None and not self._closed:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                deadline = self._first_added + self.max_delay
+                while self._count < self.max_pending and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wake.wait(remaining)
+            try:
+                self._flush()
+            except Exception:
+                # Most likely the database is busy; the events were restored
+                time.sleep(self.max_delay)
+
+    def close(self):
+        # Stops the background thread; the caller does the final flush
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        self._thread.join()